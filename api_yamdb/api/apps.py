@@ -3,3 +3,29 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        from django.contrib.auth import get_user_model
+        from reviews.models import Category, Comment, Genre, Review, Title
+        from .cache import invalidate_on_change
+        invalidate_on_change(
+            Title, lambda title: ('titles', f'titles:{title.pk}')
+        )
+        invalidate_on_change(
+            Category,
+            lambda category: ('categories', f'categories:{category.slug}')
+        )
+        invalidate_on_change(
+            Genre, lambda genre: ('genres', f'genres:{genre.slug}')
+        )
+        # Отзыв меняет рейтинг произведения.
+        invalidate_on_change(
+            Review, lambda review: ('titles', f'titles:{review.title_id}')
+        )
+        invalidate_on_change(
+            Comment, lambda comment: (f'reviews:{comment.review_id}',)
+        )
+        # Имена авторов входят в ответы с отзывами и комментариями.
+        invalidate_on_change(
+            get_user_model(), lambda user: ('users',), on_create=False
+        )
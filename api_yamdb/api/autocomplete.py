@@ -0,0 +1,171 @@
+import heapq
+import threading
+from bisect import bisect_left, insort
+from functools import partial
+
+from reviews.models import Category, Genre, Title
+
+from .cache import get_versions, invalidate
+
+INDEX_NAMESPACE = 'autocomplete:{}'
+
+
+def normalize(text):
+    return ' '.join(text.casefold().split())
+
+
+class PrefixIndex:
+    """Префиксный индекс объектов одной модели.
+    Ключи - slug и каждый хвост названия, начинающийся с нового слова
+    (чтобы «оре» находило «Крепкий орешек»), - хранятся в отсортированном
+    списке; поиск по префиксу - двоичный поиск и проход по соседним ключам.
+    """
+
+    def __init__(self, kind, model, lookup_field):
+        self.kind = kind
+        self.model = model
+        self.lookup_field = lookup_field
+        self.keys = []
+        self.records = {}
+        self.version = None
+
+    def make_record(self, name, lookup):
+        words = normalize(name).split()
+        keys = {' '.join(words[start:]) for start in range(len(words))}
+        if self.lookup_field == 'pk':
+            payload = {'type': self.kind, 'id': lookup, 'name': name}
+        else:
+            keys.add(normalize(lookup))
+            payload = {'type': self.kind, 'slug': lookup, 'name': name}
+        return keys, payload
+
+    def rebuild(self, version):
+        self.keys, self.records = [], {}
+        rows = self.model.objects.values_list(
+            'pk', 'name', self.lookup_field
+        )
+        for pk, name, lookup in rows.iterator():
+            self.records[pk] = self.make_record(name, lookup)
+            self.keys.extend((key, pk) for key in self.records[pk][0])
+        self.keys.sort()
+        self.version = version
+
+    def add(self, pk, name, lookup):
+        self.records[pk] = self.make_record(name, lookup)
+        for key in self.records[pk][0]:
+            insort(self.keys, (key, pk))
+
+    def remove(self, pk):
+        keys, _ = self.records.pop(pk, ((), None))
+        for key in keys:
+            index = bisect_left(self.keys, (key, pk))
+            if index < len(self.keys) and self.keys[index] == (key, pk):
+                del self.keys[index]
+
+    def matches(self, prefix):
+        """Перебирает ключи с заданным префиксом по порядку."""
+        keys = self.keys
+        for position in range(bisect_left(keys, (prefix,)), len(keys)):
+            key, pk = keys[position]
+            if not key.startswith(prefix):
+                return
+            yield key, self.kind, pk
+
+
+class Autocomplete:
+    """Индексы автодополнения произведений, жанров и категорий.
+    Индексы живут в памяти процесса и привязаны к собственным версиям
+    `autocomplete:<пространство имён>` в кэше, которые сбрасываются только
+    при создании, удалении и переименовании объектов. Запись через API
+    обновляет индекс своего процесса на месте; если версия ушла дальше
+    (запись в другом процессе), индекс перестраивается при следующем
+    запросе.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.indexes = {
+            'titles': PrefixIndex('title', Title, 'pk'),
+            'genres': PrefixIndex('genre', Genre, 'slug'),
+            'categories': PrefixIndex('category', Category, 'slug'),
+        }
+        self.by_kind = {
+            index.kind: index for index in self.indexes.values()
+        }
+
+    def search(self, query, limit, namespaces=None):
+        """Возвращает до `limit` объектов, название или slug которых
+        начинается с `query`, в алфавитном порядке ключей.
+        """
+        prefix = normalize(query)
+        namespaces = [
+            namespace for namespace in namespaces or self.indexes
+            if namespace in self.indexes
+        ]
+        if not prefix or not namespaces:
+            return []
+        versions = get_versions([
+            INDEX_NAMESPACE.format(namespace) for namespace in namespaces
+        ])
+        with self.lock:
+            indexes = [self.indexes[namespace] for namespace in namespaces]
+            for index, version in zip(indexes, versions):
+                if index.version != version:
+                    index.rebuild(version)
+            found, seen = [], set()
+            for _, kind, pk in heapq.merge(
+                *(index.matches(prefix) for index in indexes)
+            ):
+                if (kind, pk) not in seen:
+                    seen.add((kind, pk))
+                    found.append(self.by_kind[kind].records[pk][1])
+                    if len(found) == limit:
+                        break
+            return found
+
+    def indexed_values(self, namespace, instance):
+        """Возвращает значения объекта, которые хранит индекс, или None,
+        если для пространства имён нет индекса.
+        """
+        index = self.indexes.get(namespace)
+        if index is None:
+            return None
+        return instance.name, getattr(instance, index.lookup_field)
+
+    def invalidate(self, namespace, changes):
+        """После фиксации транзакции сбрасывает версию индекса и применяет
+        к нему изменения `changes`: {pk: объект или None при удалении}.
+        """
+        if namespace in self.indexes:
+            invalidate(
+                INDEX_NAMESPACE.format(namespace),
+                on_bumped=partial(self.update, namespace, changes)
+            )
+
+    def invalidate_all(self):
+        """После фиксации транзакции сбрасывает версии всех индексов:
+        они перестроятся при следующем запросе.
+        """
+        invalidate(*(
+            INDEX_NAMESPACE.format(namespace) for namespace in self.indexes
+        ))
+
+    def update(self, namespace, changes, versions):
+        """Применяет изменения к индексу. Вызывается с прежней и новой
+        версиями после сброса: индекс обновляется на месте, только если
+        до записи он был актуален.
+        """
+        index = self.indexes[namespace]
+        previous, version = versions[0]
+        with self.lock:
+            if previous is None or index.version != previous:
+                return
+            for pk, instance in changes.items():
+                index.remove(pk)
+                if instance is not None:
+                    index.add(pk, instance.name,
+                              getattr(instance, index.lookup_field))
+            index.version = version
+
+
+autocomplete = Autocomplete()
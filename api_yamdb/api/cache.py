@@ -0,0 +1,176 @@
+import hashlib
+import time
+from http import HTTPStatus
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils.cache import parse_etags
+from rest_framework.response import Response
+
+VERSION_KEY = 'api-cache:version:{}'
+RESPONSE_KEY = 'api-cache:response:{}'
+HITS_KEY = 'api-cache:hits'
+MISSES_KEY = 'api-cache:misses'
+
+
+def new_version():
+    return time.time_ns()
+
+
+def get_versions(namespaces):
+    """Возвращает текущие версии пространств имён кэша.
+    Отсутствующая версия создаётся из текущего времени, поэтому после
+    очистки или вытеснения кэша старые записи не совпадут с новыми ключами.
+    Если кэш ничего не хранит (DummyCache), каждый вызов возвращает новые
+    версии: закэшированное и проиндексированное не считается актуальным.
+    """
+    keys = [VERSION_KEY.format(namespace) for namespace in namespaces]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, new_version(), None)
+            versions[key] = cache.get(key)
+        if versions[key] is None:
+            versions[key] = new_version()
+    return [versions[key] for key in keys]
+
+
+def bump_versions(*namespaces):
+    """Делает недействительными ответы, зависящие от пространств имён.
+    Возвращает пары (прежняя версия или None, новая версия).
+    Новая версия - новое уникальное значение, а не инкремент: сбросы из
+    разных процессов не сливаются в одну версию и на бэкендах без
+    атомарного incr (например, файловом).
+    """
+    keys = [VERSION_KEY.format(namespace) for namespace in namespaces]
+    previous = cache.get_many(keys)
+    versions = {key: new_version() for key in keys}
+    cache.set_many(versions, None)
+    return [(previous.get(key), versions[key]) for key in keys]
+
+
+def invalidate(*namespaces, on_bumped=None):
+    """Сбрасывает версии после фиксации текущей транзакции, чтобы
+    параллельный запрос не закэшировал ещё не изменённые данные.
+    `on_bumped` получает результат `bump_versions`.
+    """
+    def bump():
+        versions = bump_versions(*namespaces)
+        if on_bumped is not None:
+            on_bumped(versions)
+
+    transaction.on_commit(bump)
+
+
+def invalidate_on_change(model, get_namespaces, on_create=True):
+    """Сбрасывает версии `get_namespaces(объект)` при сохранении и удалении
+    объектов модели, в том числе каскадном, из админки и команд.
+    `on_create=False` - новые объекты не входят в закэшированные ответы.
+    """
+    def handler(sender, instance, raw=False, created=False, **kwargs):
+        if not raw and (on_create or not created):
+            invalidate(*get_namespaces(instance))
+
+    post_save.connect(handler, sender=model, weak=False)
+    post_delete.connect(handler, sender=model, weak=False)
+
+
+def count(key):
+    """Увеличивает счётчик, если сбор статистики включён
+    (`API_CACHE_STATS`); счётчик создаётся при первом обращении.
+    """
+    if not settings.API_CACHE_STATS:
+        return
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def get_stats():
+    """Возвращает счётчики попаданий и промахов кэша ответов."""
+    stats = cache.get_many((HITS_KEY, MISSES_KEY))
+    return {
+        'hits': stats.get(HITS_KEY, 0),
+        'misses': stats.get(MISSES_KEY, 0),
+    }
+
+
+def reset_stats():
+    cache.delete_many((HITS_KEY, MISSES_KEY))
+
+
+def get_fingerprint(request, namespaces):
+    """Возвращает отпечаток ответа: он меняется при изменении запроса
+    или любой из версий, от которых зависит ответ. Схема и хост входят
+    в отпечаток, так как из них строятся ссылки `next` и `previous`.
+    """
+    query = sorted(request.query_params.lists())
+    versions = get_versions(namespaces)
+    raw = (
+        f'{request.scheme}://{request.get_host()}{request.path}?{query}'
+        f'|{namespaces}|{versions}'
+    )
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def get_etag(request, fingerprint):
+    return f'"{fingerprint}-{request.accepted_renderer.format}"'
+
+
+def not_modified(request, etag):
+    """Проверяет, что у клиента уже есть актуальная версия ответа.
+    ETag сравниваются слабо: сжатые ответы отдаются с префиксом `W/`.
+    """
+    etags = [
+        tag[2:] if tag.startswith('W/') else tag
+        for tag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+    ]
+    if etag in etags or '*' in etags:
+        response = Response(status=HTTPStatus.NOT_MODIFIED)
+        response['ETag'] = etag
+        return response
+    return None
+
+
+def conditional_response(handler, namespaces, request, *args, **kwargs):
+    """Отвечает 304, если ETag клиента актуален, не обращаясь к БД;
+    иначе вызывает обработчик и добавляет ETag к успешному ответу.
+    """
+    etag = get_etag(request, get_fingerprint(request, namespaces))
+    response = not_modified(request, etag)
+    if response is not None:
+        return response
+    response = handler(request, *args, **kwargs)
+    if response.status_code == HTTPStatus.OK:
+        response['ETag'] = etag
+    return response
+
+
+def cached_response(handler, namespaces, request, *args, **kwargs):
+    """Возвращает ответ из кэша или вызывает обработчик и кэширует
+    успешный ответ. Как и `conditional_response`, поддерживает ETag.
+    """
+    fingerprint = get_fingerprint(request, namespaces)
+    etag = get_etag(request, fingerprint)
+    response = not_modified(request, etag)
+    if response is not None:
+        return response
+    key = RESPONSE_KEY.format(fingerprint)
+    data = cache.get(key)
+    if data is not None:
+        count(HITS_KEY)
+        response = Response(data)
+        response['X-Cache'] = 'HIT'
+        response['ETag'] = etag
+        return response
+    count(MISSES_KEY)
+    response = handler(request, *args, **kwargs)
+    if response.status_code == HTTPStatus.OK:
+        cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        response['ETag'] = etag
+    response['X-Cache'] = 'MISS'
+    return response
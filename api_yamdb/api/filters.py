@@ -1,14 +1,77 @@
+from django import forms
+from django.conf import settings
+from django.db.models import Case, IntegerField, Value, When
 from django_filters import rest_framework as filters
+from rest_framework.exceptions import ValidationError
 
-from reviews.models import Title
+from reviews.models import SCORE_FIELDS, Category, Genre, GenreTitle, Title
+from reviews.search import search_titles
+
+
+class CharInFilter(filters.BaseInFilter, filters.CharFilter):
+    """Фильтр по списку строк через запятую."""
+
+
+class IntegerInFilter(filters.BaseInFilter, filters.Filter):
+    """Фильтр по списку целых чисел через запятую."""
+
+    field_class = forms.IntegerField
 
 
 class TitleFilter(filters.FilterSet):
-    category = filters.CharFilter(field_name='category__slug')
-    genre = filters.CharFilter(field_name='genre__slug')
+    """Фильтры произведений.
+    Слаги категории и жанра переводятся в id подзапросами, чтобы фильтры
+    шли по индексам `reviews_title` и `reviews_genretitle` без соединения
+    с таблицами категорий и жанров. Рейтинг фильтруется по хранимому
+    столбцу с индексом, а не по агрегату над отзывами.
+    `ids` возвращает произведения в порядке перечисления id.
+    """
+
+    category = filters.CharFilter(method='filter_category')
+    category__in = CharInFilter(method='filter_category')
+    genre = filters.CharFilter(method='filter_genre')
+    genre__in = CharInFilter(method='filter_genre')
     name = filters.CharFilter(field_name='name')
     year = filters.NumberFilter(field_name='year')
+    year__gte = filters.NumberFilter(field_name='year', lookup_expr='gte')
+    year__lte = filters.NumberFilter(field_name='year', lookup_expr='lte')
+    rating__gte = filters.NumberFilter(field_name='rating', lookup_expr='gte')
+    search = filters.CharFilter(method='filter_search')
+    ids = IntegerInFilter(method='filter_ids')
 
     class Meta:
         model = Title
         fields = '__all__'
+        exclude = ('rating_sum', 'rating_count', 'rating', *SCORE_FIELDS)
+
+    @staticmethod
+    def slugs(value):
+        return value if isinstance(value, list) else [value]
+
+    def filter_category(self, queryset, name, value):
+        return queryset.filter(category_id__in=Category.objects.filter(
+            slug__in=self.slugs(value)
+        ).values('pk'))
+
+    def filter_genre(self, queryset, name, value):
+        return queryset.filter(pk__in=GenreTitle.objects.filter(
+            genre_id__in=Genre.objects.filter(
+                slug__in=self.slugs(value)
+            ).values('pk')
+        ).values('title_id'))
+
+    def filter_search(self, queryset, name, value):
+        """Полнотекстовый поиск по названию и описанию с ранжированием."""
+        return search_titles(queryset, value)
+
+    def filter_ids(self, queryset, name, value):
+        ids = list(dict.fromkeys(value))
+        if len(ids) > settings.API_MAX_IDS:
+            raise ValidationError({
+                name: f'Не более {settings.API_MAX_IDS} id за запрос.'
+            })
+        return queryset.filter(pk__in=ids).order_by(Case(
+            *(When(pk=pk, then=Value(position))
+              for position, pk in enumerate(ids)),
+            output_field=IntegerField(),
+        ))
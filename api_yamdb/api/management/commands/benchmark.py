@@ -0,0 +1,375 @@
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+from statistics import mean
+
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from users.authentication import RoleAccessToken
+
+User = get_user_model()
+
+Scenario = namedtuple(
+    'Scenario', 'name method url client data format', defaults=(None,)
+)
+# Число произведений в сценариях titles-bulk-create и titles-multi-get.
+BULK_SIZE = 100
+MULTI_GET_SIZE = 50
+
+TEXT = (
+    'Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do '
+    'eiusmod tempor incididunt ut labore et dolore magna aliqua.'
+)
+
+
+def percentile(values, fraction):
+    """Возвращает перцентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def batched_create(model, objects, batch_size):
+    """Сохраняет объекты генератора пачками, не держа их все в памяти."""
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            model.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch)
+
+
+def seed(sizes, batch_size, rng):
+    """Наполняет базу синтетическими данными заданного объёма."""
+    users, titles = sizes['users'], sizes['titles']
+    if sizes['reviews'] > users * titles:
+        raise CommandError(
+            'Number of reviews cannot exceed users * titles '
+            '(one review per author and title).'
+        )
+    batched_create(User, (
+        User(username=f'user{idx}', email=f'user{idx}@yamdb.fake')
+        for idx in range(users)
+    ), batch_size)
+    batched_create(Category, (
+        Category(name=f'Категория {idx}', slug=f'category-{idx}')
+        for idx in range(sizes['categories'])
+    ), batch_size)
+    batched_create(Genre, (
+        Genre(name=f'Жанр {idx}', slug=f'genre-{idx}')
+        for idx in range(sizes['genres'])
+    ), batch_size)
+    user_ids = list(User.objects.values_list('pk', flat=True))
+    category_ids = list(Category.objects.values_list('pk', flat=True))
+    genre_ids = list(Genre.objects.values_list('pk', flat=True))
+    batched_create(Title, (
+        Title(
+            name=f'Произведение {idx}',
+            year=rng.randint(1900, 2020),
+            category_id=rng.choice(category_ids),
+            description=TEXT,
+        )
+        for idx in range(titles)
+    ), batch_size)
+    title_ids = list(Title.objects.values_list('pk', flat=True))
+    batched_create(GenreTitle, (
+        GenreTitle(title_id=title_id, genre_id=genre_id)
+        for title_id in title_ids
+        for genre_id in rng.sample(genre_ids, min(3, len(genre_ids)))
+    ), batch_size)
+    batched_create(Review, (
+        Review(
+            title_id=title_ids[idx % titles],
+            author_id=user_ids[idx // titles],
+            text=TEXT,
+            score=rng.randint(1, 10),
+        )
+        for idx in range(sizes['reviews'])
+    ), batch_size)
+    Title.objects.rebuild_rating()
+    review_ids = list(
+        Review.objects.order_by('pk').values_list('pk', flat=True)[:titles]
+    )
+    batched_create(Comment, (
+        Comment(
+            review_id=review_ids[idx % len(review_ids)],
+            author_id=user_ids[idx % users],
+            text=TEXT,
+        )
+        for idx in range(sizes['comments'] if review_ids else 0)
+    ), batch_size)
+
+
+def make_client(user=None, accept_encoding=None):
+    headers = {}
+    if accept_encoding:
+        headers['HTTP_ACCEPT_ENCODING'] = accept_encoding
+    client = APIClient(**headers)
+    if user is not None:
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(user)}'
+        )
+    return client
+
+
+def signup_data(number):
+    return {
+        'username': f'signup{number}',
+        'email': f'signup{number}@yamdb.fake',
+    }
+
+
+def title_data(number, category, genres):
+    return {
+        'name': f'Новое произведение {number}',
+        'year': 2000,
+        'category': category.slug,
+        'genre': [genre.slug for genre in genres],
+    }
+
+
+def build_scenarios(accept_encoding=None):
+    """Описывает запросы, которые измеряются для каждого эндпоинта."""
+    admin = User.objects.create_user(
+        username='bench-admin', email='bench-admin@yamdb.fake', role='admin'
+    )
+    anonymous = make_client(accept_encoding=accept_encoding)
+    authorized = make_client(admin, accept_encoding)
+    title = Title.objects.order_by('pk').first()
+    review = title.reviews.order_by('pk').first()
+    comment = review.comments.order_by('pk').first()
+    category = Category.objects.order_by('pk').first()
+    genre = Genre.objects.order_by('pk').first()
+    genres = list(Genre.objects.order_by('pk')[:3])
+    all_ids = list(Title.objects.order_by('-pk').values_list('pk', flat=True))
+    title_ids = all_ids[::max(1, len(all_ids) // MULTI_GET_SIZE)][
+        :MULTI_GET_SIZE
+    ]
+    created = iter(range(sys.maxsize))
+    signups = iter(range(sys.maxsize))
+    token_user = User.objects.order_by('pk').first()
+    title_url = f'/api/v1/titles/{title.pk}/'
+    review_url = f'{title_url}reviews/{review.pk}/'
+    return [
+        Scenario('categories-list', 'get', '/api/v1/categories/',
+                 anonymous, None),
+        Scenario('genres-list', 'get', '/api/v1/genres/', anonymous, None),
+        Scenario('titles-list', 'get', '/api/v1/titles/', anonymous, None),
+        Scenario('titles-filter', 'get',
+                 f'/api/v1/titles/?genre={genre.slug}'
+                 f'&category={category.slug}', anonymous, None),
+        Scenario('titles-list-sparse', 'get',
+                 '/api/v1/titles/?fields=id,name,year', anonymous, None),
+        Scenario('titles-detail', 'get', title_url, anonymous, None),
+        Scenario('titles-multi-get', 'get',
+                 f'/api/v1/titles/?ids={",".join(map(str, title_ids))}',
+                 anonymous, None),
+        Scenario('titles-create', 'post', '/api/v1/titles/', authorized,
+                 lambda: title_data(next(created), category, genres),
+                 'json'),
+        Scenario('titles-bulk-create', 'post', '/api/v1/titles/bulk/',
+                 authorized,
+                 lambda: [
+                     title_data(next(created), category, genres)
+                     for _ in range(BULK_SIZE)
+                 ], 'json'),
+        Scenario('reviews-list', 'get', f'{title_url}reviews/',
+                 anonymous, None),
+        Scenario('reviews-list-sparse', 'get',
+                 f'{title_url}reviews/?fields=id,score', anonymous, None),
+        Scenario('reviews-detail', 'get', review_url, anonymous, None),
+        Scenario('comments-list', 'get', f'{review_url}comments/',
+                 anonymous, None),
+        Scenario('comments-detail', 'get',
+                 f'{review_url}comments/{comment.pk}/', anonymous, None),
+        Scenario('users-list', 'get', '/api/v1/users/', authorized, None),
+        Scenario('users-me', 'get', '/api/v1/users/me/', authorized, None),
+        Scenario('auth-signup', 'post', '/api/v1/auth/signup/', anonymous,
+                 lambda: signup_data(next(signups))),
+        Scenario('auth-token', 'post', '/api/v1/auth/token/', anonymous,
+                 lambda: {
+                     'username': token_user.username,
+                     'confirmation_code':
+                         default_token_generator.make_token(token_user),
+                 }),
+    ]
+
+
+def send(scenario):
+    data = scenario.data() if scenario.data else None
+    response = getattr(scenario.client, scenario.method)(
+        scenario.url, data=data, format=scenario.format
+    )
+    if response.status_code >= 400:
+        raise CommandError(
+            f'{scenario.name}: {scenario.method.upper()} {scenario.url} '
+            f'returned {response.status_code}'
+        )
+    return response
+
+
+def measure(scenario, repeat, warmup):
+    """Снимает латентность, число запросов к БД и аллокации сценария."""
+    for _ in range(warmup):
+        send(scenario)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        send(scenario)
+        timings.append((time.perf_counter() - start) * 1000)
+    reset_queries()
+    with CaptureQueriesContext(connection) as context:
+        response = send(scenario)
+    tracemalloc.start()
+    send(scenario)
+    allocated, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'p50_ms': round(percentile(timings, 0.5), 3),
+        'p99_ms': round(percentile(timings, 0.99), 3),
+        'mean_ms': round(mean(timings), 3),
+        'queries': len(context.captured_queries),
+        'alloc_peak_bytes': peak,
+        'alloc_retained_bytes': allocated,
+        'response_bytes': len(response.content),
+    }
+
+
+class Command(BaseCommand):
+    """Измеряет производительность эндпоинтов /api/v1 на синтетических
+    данных во временной базе.
+    """
+
+    help = (
+        'Seed a throwaway database with synthetic data and measure latency, '
+        'queries and allocations of every /api/v1 endpoint'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--genres', type=int, default=50)
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--reviews', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument('--repeat', type=int, default=50,
+                            help='Timed requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--only', nargs='*', default=None,
+                            help='Names of scenarios to run')
+        parser.add_argument(
+            '--db-file', default=None,
+            help='SQLite file for the throwaway database '
+                 '(in-memory by default)'
+        )
+        parser.add_argument(
+            '--with-cache', action='store_true',
+            help='Keep the response cache enabled; by default it is '
+                 'replaced by a dummy cache to measure the full request path'
+        )
+        parser.add_argument(
+            '--model-serializers', action='store_true',
+            help='Serialize list pages through model instances instead of '
+                 'values() rows, for comparison'
+        )
+        parser.add_argument(
+            '--accept-encoding', default=None,
+            help='Accept-Encoding header sent with every request, e.g. gzip; '
+                 'response_bytes then reports the compressed size'
+        )
+        parser.add_argument('--output', default=None,
+                            help='Write the JSON report to this file')
+        parser.add_argument('--compare', default=None,
+                            help='Previous JSON report to diff against')
+
+    def handle(self, *args, **options):
+        sizes = {
+            name: options[name] for name in (
+                'users', 'categories', 'genres', 'titles', 'reviews',
+                'comments',
+            )
+        }
+        if options['db_file']:
+            connection.settings_dict['TEST']['NAME'] = options['db_file']
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        overrides = {
+            'EMAIL_BACKEND': 'django.core.mail.backends.locmem.EmailBackend',
+        }
+        if not options['with_cache']:
+            overrides['CACHES'] = {'default': {
+                'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+            }}
+        if options['model_serializers']:
+            overrides['API_ROW_SERIALIZATION'] = False
+        try:
+            with override_settings(**overrides):
+                report = self.run(sizes, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+        dump = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf8') as file:
+                file.write(dump + '\n')
+        else:
+            self.stdout.write(dump)
+        if options['compare']:
+            with open(options['compare'], encoding='utf8') as file:
+                self.compare(json.load(file), report)
+
+    def run(self, sizes, options):
+        started = time.perf_counter()
+        seed(sizes, options['batch_size'], random.Random(options['seed']))
+        seed_seconds = time.perf_counter() - started
+        self.stderr.write(f'Seeded {sizes} in {seed_seconds:.1f}s')
+        results = {}
+        for scenario in build_scenarios(options['accept_encoding']):
+            if options['only'] and scenario.name not in options['only']:
+                continue
+            results[scenario.name] = measure(
+                scenario, options['repeat'], options['warmup']
+            )
+            self.stderr.write(f'{scenario.name}: {results[scenario.name]}')
+        return {
+            'meta': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'sizes': sizes,
+                'repeat': options['repeat'],
+                'with_cache': options['with_cache'],
+                'model_serializers': options['model_serializers'],
+                'accept_encoding': options['accept_encoding'],
+                'seed_seconds': round(seed_seconds, 3),
+            },
+            'endpoints': results,
+        }
+
+    def compare(self, before, after):
+        """Печатает изменение метрик относительно предыдущего отчёта."""
+        for name, metrics in after['endpoints'].items():
+            old = before.get('endpoints', {}).get(name)
+            if old is None:
+                continue
+            changes = ', '.join(
+                f'{key} {old[key]} -> {value}'
+                for key, value in metrics.items()
+                if key in old and old[key] != value
+            )
+            self.stdout.write(f'{name}: {changes or "no changes"}')
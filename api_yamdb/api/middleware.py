@@ -0,0 +1,133 @@
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def accepted_encodings(header):
+    """Возвращает веса кодировок из Accept-Encoding: {кодировка: q}."""
+    accepted = {}
+    for item in header.split(','):
+        coding, *params = item.split(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.strip().partition('=')
+            if name.lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def choose_encoding(header):
+    """Выбирает поддерживаемую кодировку с наибольшим весом; при равных
+    весах brotli предпочтительнее gzip. Кодировка, не названная явно,
+    получает вес `*`. Если явно указанный вес identity больше, ответ
+    не сжимается.
+    """
+    accepted = accepted_encodings(header)
+    default = accepted.get('*', 0.0)
+    candidates = ('br', 'gzip') if brotli is not None else ('gzip',)
+    encoding, quality = None, 0.0
+    for coding in candidates:
+        weight = accepted.get(coding, default)
+        if weight > quality:
+            encoding, quality = coding, weight
+    if accepted.get('identity', 0.0) > quality:
+        return None
+    return encoding
+
+
+def gzip_compressor():
+    return zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+
+def compress(encoding, content):
+    if encoding == 'br':
+        return brotli.compress(
+            content, quality=settings.COMPRESSION_BROTLI_QUALITY
+        )
+    compressor = gzip_compressor()
+    return compressor.compress(content) + compressor.flush()
+
+
+def compress_stream(encoding, chunks):
+    """Сжимает поток, отдавая сжатые данные после каждого фрагмента,
+    чтобы клиент получал ответ по мере его формирования.
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(
+            quality=settings.COMPRESSION_BROTLI_QUALITY
+        )
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+    compressor = gzip_compressor()
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Сжимает ответы в brotli (если установлен пакет brotli) или gzip.
+    Сжимаются только типы из COMPRESSION_CONTENT_TYPES и ответы не короче
+    COMPRESSION_MIN_SIZE байт: короткие ответы сжатие почти не уменьшает.
+    Потоковые ответы сжимаются по фрагментам без буферизации.
+    """
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '')
+        if content_type.split(';')[0].strip().lower() not in (
+            settings.COMPRESSION_CONTENT_TYPES
+        ):
+            return response
+        if (
+            not response.streaming
+            and len(response.content) < settings.COMPRESSION_MIN_SIZE
+        ):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                encoding, response.streaming_content
+            )
+            del response['Content-Length']
+        else:
+            content = compress(encoding, response.content)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response['Content-Length'] = str(len(content))
+
+        # Сжатое представление отличается побайтно, поэтому ETag
+        # становится слабым (RFC 7232, раздел 2.1).
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
@@ -1,9 +1,20 @@
+from django.conf import settings
+from django.core.exceptions import (FieldDoesNotExist,
+                                    ValidationError as DjangoValidationError)
+from rest_framework.exceptions import ValidationError
 from rest_framework.mixins import (CreateModelMixin, DestroyModelMixin,
                                    ListModelMixin)
 from rest_framework.viewsets import GenericViewSet
 from rest_framework.filters import SearchFilter
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.relations import SlugRelatedField
+from rest_framework.response import Response
+from rest_framework.serializers import Serializer
 
+from .autocomplete import autocomplete
+from .cache import cached_response, conditional_response, invalidate
 from .permissions import IsAdminOrReadOnly
+from .rows import RowSerializer
 
 
 class CreateListDeleteModelMixin(CreateModelMixin, ListModelMixin,
@@ -11,7 +22,257 @@ class CreateListDeleteModelMixin(CreateModelMixin, ListModelMixin,
     pass
 
 
-class AttributesModelMixin(CreateListDeleteModelMixin):
+class CachedListMixin:
+    """Кэширует ответы на запросы списка.
+    `cache_namespace` - пространство имён объектов вьюсета, изменения
+    которых сбрасывают кэш; `cache_depends_on` - пространства имён других
+    объектов, входящих в ответ.
+    """
+
+    cache_namespace = None
+    cache_depends_on = ()
+
+    def get_cache_namespaces(self):
+        lookup = self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        if lookup is None:
+            return (self.cache_namespace, *self.cache_depends_on)
+        return (
+            f'{self.cache_namespace}:{self.normalize_lookup(lookup)}',
+            *self.cache_depends_on
+        )
+
+    def normalize_lookup(self, lookup):
+        """Приводит значение из URL к значению поля модели, по которому
+        сбрасывает кэш `invalidate_cache`: `/titles/0002/` и `/titles/2/`
+        попадают в одно пространство имён.
+        """
+        opts = self.queryset.model._meta
+        field = (
+            opts.pk if self.lookup_field == 'pk'
+            else opts.get_field(self.lookup_field)
+        )
+        try:
+            return field.to_python(lookup)
+        except DjangoValidationError:
+            return lookup
+
+    def list(self, request, *args, **kwargs):
+        return cached_response(
+            super().list, self.get_cache_namespaces(), request,
+            *args, **kwargs
+        )
+
+    def invalidate_cache(self, pk, lookup, instance=None, reindex=True):
+        """Сбрасывает кэш и, если `reindex`, обновляет индекс
+        автодополнения; `instance` равен None при удалении объекта.
+        """
+        invalidate(self.cache_namespace, f'{self.cache_namespace}:{lookup}')
+        if reindex:
+            autocomplete.invalidate(self.cache_namespace, {pk: instance})
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        instance = serializer.instance
+        self.invalidate_cache(
+            instance.pk, getattr(instance, self.lookup_field), instance
+        )
+
+    def perform_update(self, serializer):
+        instance = serializer.instance
+        indexed = autocomplete.indexed_values(self.cache_namespace, instance)
+        super().perform_update(serializer)
+        self.invalidate_cache(
+            instance.pk, getattr(instance, self.lookup_field), instance,
+            reindex=indexed != autocomplete.indexed_values(
+                self.cache_namespace, instance
+            )
+        )
+
+    def perform_destroy(self, instance):
+        pk, lookup = instance.pk, getattr(instance, self.lookup_field)
+        super().perform_destroy(instance)
+        self.invalidate_cache(pk, lookup)
+
+
+class CachedResponseMixin(CachedListMixin):
+    """Кэширует ответы на запросы списка и отдельного объекта."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return cached_response(
+            super().retrieve, self.get_cache_namespaces(), request,
+            *args, **kwargs
+        )
+
+
+class ConditionalGetMixin:
+    """Отвечает 304 на GET-запросы списка и отдельного объекта, если ETag
+    клиента совпадает с текущими версиями из `get_etag_namespaces`.
+    """
+
+    def get_etag_namespaces(self):
+        raise NotImplementedError
+
+    def list(self, request, *args, **kwargs):
+        return conditional_response(
+            super().list, self.get_etag_namespaces(), request,
+            *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return conditional_response(
+            super().retrieve, self.get_etag_namespaces(), request,
+            *args, **kwargs
+        )
+
+
+class SparseFieldsMixin:
+    """Позволяет выбрать поля ответа параметрами `fields` и `omit`
+    (имена через запятую). Невыбранные поля не сериализуются и не читаются
+    из БД: простые поля откладываются `defer()`, а связи из
+    `select_related_fields` и `prefetch_related_fields` не загружаются.
+    `required_fields` загружаются всегда, например, для пагинации.
+    """
+
+    fields_param = 'fields'
+    omit_param = 'omit'
+    select_related_fields = ()
+    prefetch_related_fields = ()
+    required_fields = ()
+
+    def get_readable_fields(self):
+        return {
+            name: field
+            for name, field in self.get_serializer_class()().fields.items()
+            if not field.write_only
+        }
+
+    def parse_fields_param(self, param, readable):
+        value = self.request.query_params.get(param)
+        if value is None:
+            return None
+        names = {name.strip() for name in value.split(',') if name.strip()}
+        unknown = names - set(readable)
+        if unknown:
+            raise ValidationError({
+                param: f'Неизвестные поля: {", ".join(sorted(unknown))}.'
+            })
+        return names
+
+    def get_shown_fields(self):
+        """Возвращает имена полей ответа или None, если выбраны все."""
+        if not hasattr(self, '_shown_fields'):
+            self._shown_fields = None
+            if self.request.method in SAFE_METHODS:
+                readable = self.get_readable_fields()
+                shown = self.parse_fields_param(self.fields_param, readable)
+                omitted = self.parse_fields_param(self.omit_param, readable)
+                if shown is not None or omitted is not None:
+                    self._shown_fields = (
+                        (set(readable) if shown is None else shown)
+                        - (omitted or set())
+                    )
+        return self._shown_fields
+
+    def filter_queryset(self, queryset):
+        return self.project_queryset(super().filter_queryset(queryset))
+
+    def project_queryset(self, queryset):
+        """Загружает из БД только то, что нужно для выбранных полей."""
+        shown = self.get_shown_fields()
+        if shown is None:
+            shown = set(self.get_readable_fields())
+        related = [
+            name for name in self.select_related_fields if name in shown
+        ]
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.prefetch_related(*(
+            name for name in self.prefetch_related_fields if name in shown
+        )).defer(*self.get_deferred_fields(queryset.model, shown))
+
+    def get_deferred_fields(self, model, shown):
+        """Возвращает поля модели и присоединённых `select_related`
+        моделей, которые не нужны для выбранных полей.
+        """
+        deferred = []
+        for name, field in self.get_readable_fields().items():
+            if name in shown and name in self.select_related_fields:
+                deferred.extend(self.get_deferred_related_fields(
+                    model._meta.get_field(field.source), field
+                ))
+            if name in shown or field.source in self.required_fields:
+                continue
+            for source in getattr(field, 'columns', (field.source,)):
+                try:
+                    model_field = model._meta.get_field(source)
+                except FieldDoesNotExist:
+                    continue
+                if model_field.concrete and not model_field.primary_key:
+                    deferred.append(source)
+        return deferred
+
+    def get_deferred_related_fields(self, model_field, field):
+        """Для связи, которую выводит слаг или вложенный сериализатор,
+        возвращает ненужные им поля связанной модели.
+        """
+        if isinstance(field, SlugRelatedField):
+            needed = {field.slug_field}
+        elif isinstance(field, Serializer):
+            needed = {sub.source for sub in field.fields.values()}
+        else:
+            return []
+        return [
+            f'{model_field.name}__{related.name}'
+            for related in model_field.related_model._meta.concrete_fields
+            if not related.primary_key and related.name not in needed
+        ]
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        shown = self.get_shown_fields()
+        if shown is not None:
+            fields = getattr(serializer, 'child', serializer).fields
+            for name in set(fields) - shown:
+                fields.pop(name)
+        return serializer
+
+
+class RowListMixin:
+    """Отдаёт списки, сериализуя строки values() через `RowSerializer`,
+    без создания объектов моделей. Если сериализатор содержит поля,
+    которые нельзя построить из values(), или `API_ROW_SERIALIZATION`
+    выключен, используется обычная сериализация.
+    """
+
+    def list(self, request, *args, **kwargs):
+        rows = None
+        if settings.API_ROW_SERIALIZATION:
+            rows = RowSerializer.for_serializer(self.get_serializer(many=True))
+        if rows is None:
+            return super().list(request, *args, **kwargs)
+        queryset = rows.values(
+            self.filter_queryset(self.get_queryset()), self.get_row_columns()
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(rows.serialize(page))
+        return Response(rows.serialize(queryset))
+
+    def get_row_columns(self):
+        """Возвращает столбцы, которые выбираются помимо полей ответа:
+        `required_fields` вьюсета и поля, по которым пагинатор строит
+        курсор, даже если `fields` или `omit` убрали их из ответа.
+        """
+        ordering = getattr(self.paginator, 'ordering', None) or ()
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        return {
+            *getattr(self, 'required_fields', ()),
+            *(name.lstrip('-') for name in ordering),
+        }
+
+
+class AttributesModelMixin(CachedListMixin, CreateListDeleteModelMixin):
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (SearchFilter,)
     search_fields = ('name',)
@@ -0,0 +1,57 @@
+from django.conf import settings
+from rest_framework.pagination import (BasePagination, CursorPagination,
+                                       PageNumberPagination)
+
+
+class TitlePagination(PageNumberPagination):
+    """Постраничная пагинация произведений. Запрос по списку `ids`
+    возвращает все найденные произведения одной страницей: их не больше
+    `API_MAX_IDS`.
+    """
+
+    def get_page_size(self, request):
+        if 'ids' in request.query_params:
+            return settings.API_MAX_IDS
+        return super().get_page_size(request)
+
+
+class PublishedCursorPagination(CursorPagination):
+    """Курсорная пагинация публикаций от новых к старым.
+    Позиция задаётся датой публикации, `id` упорядочивает записи
+    с одинаковой датой.
+    """
+
+    ordering = ('-pub_date', '-id')
+
+
+class PublishedPagination(BasePagination):
+    """Пагинация отзывов и комментариев.
+    По умолчанию постраничная; при наличии параметра `cursor` в запросе
+    (первая страница - `?cursor=`) используется курсорная пагинация,
+    скорость которой не зависит от глубины страницы.
+    """
+
+    # Поля, по которым курсор задаёт позицию; должны быть в выборке.
+    ordering = PublishedCursorPagination.ordering
+
+    def __init__(self):
+        self.paginator = PageNumberPagination()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        cursor = PublishedCursorPagination()
+        if cursor.cursor_query_param in request.query_params:
+            self.paginator = cursor
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    def get_results(self, data):
+        return self.paginator.get_results(data)
+
+    @property
+    def display_page_controls(self):
+        return self.paginator.display_page_controls
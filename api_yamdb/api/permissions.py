@@ -16,7 +16,7 @@ class ReviewCommentPermission(BasePermission):
         return (
             request.method in SAFE_METHODS
             or request.method == "POST"
-            or request.user == obj.author
+            or obj.author_id == request.user.pk
             or request.user.is_admin
             or request.user.is_moderator
         )
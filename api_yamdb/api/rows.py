@@ -0,0 +1,146 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField, SlugRelatedField
+
+UNSUPPORTED = (serializers.SerializerMethodField, serializers.HiddenField)
+
+
+class Unsupported(Exception):
+    """Поле сериализатора нельзя получить из строки values()."""
+
+
+def plain_field(field):
+    if isinstance(field, UNSUPPORTED) or isinstance(
+        field, (serializers.BaseSerializer, serializers.RelatedField)
+    ):
+        raise Unsupported(field)
+    return field.to_representation
+
+
+class RowSerializer:
+    """Сериализует строки values() по полям готового сериализатора
+    без создания объектов моделей и обхода полей сериализатора для каждой
+    строки. Результат совпадает с `serializer.data`.
+    Поддерживаются простые поля, `PrimaryKeyRelatedField`,
+    `SlugRelatedField`, вложенные сериализаторы из простых полей
+    (одиночные по внешнему ключу и `many=True` по связи многие-ко-многим)
+    и поля с атрибутом `columns` и методом `from_values`, которые строят
+    значение по нескольким столбцам модели.
+    """
+
+    def __init__(self, serializer):
+        serializer = getattr(serializer, 'child', serializer)
+        self.model = serializer.Meta.model
+        self.pk = self.model._meta.pk.attname
+        self.columns = {self.pk}
+        self.accessors = []
+        self.related = []
+        for name, field in serializer.fields.items():
+            if not field.write_only:
+                self.accessors.append((name, self.compile(name, field)))
+
+    @classmethod
+    def for_serializer(cls, serializer):
+        """Возвращает RowSerializer или None, если сериализатор содержит
+        поля, которые нельзя построить из values().
+        """
+        try:
+            return cls(serializer)
+        except (Unsupported, FieldDoesNotExist):
+            return None
+
+    def compile(self, name, field):
+        """Возвращает функцию, строящую значение поля по строке."""
+        source = field.source
+        columns = getattr(field, 'columns', None)
+        if columns is not None:
+            for column in columns:
+                self.model._meta.get_field(column)
+            self.columns.update(columns)
+            return lambda row: field.from_values(
+                row[column] for column in columns
+            )
+        if isinstance(field, serializers.ListSerializer):
+            return self.compile_many(name, source, field.child)
+        if isinstance(field, serializers.BaseSerializer):
+            return self.compile_nested(source, field)
+        if isinstance(field, PrimaryKeyRelatedField):
+            self.model._meta.get_field(source)
+            return self.column(source, None)
+        if isinstance(field, SlugRelatedField):
+            self.model._meta.get_field(source)
+            return self.column(f'{source}__{field.slug_field}', None)
+        self.model._meta.get_field(source)
+        return self.column(source, plain_field(field))
+
+    def column(self, key, convert):
+        self.columns.add(key)
+        if convert is None:
+            return lambda row: row[key]
+        return lambda row: None if row[key] is None else convert(row[key])
+
+    def compile_nested(self, source, serializer):
+        self.model._meta.get_field(source)
+        self.columns.add(source)
+        fields = [
+            (name, f'{source}__{field.source}', plain_field(field))
+            for name, field in serializer.fields.items()
+        ]
+        self.columns.update(key for _, key, _ in fields)
+
+        def nested(row):
+            if row[source] is None:
+                return None
+            return {
+                name: None if row[key] is None else convert(row[key])
+                for name, key, convert in fields
+            }
+        return nested
+
+    def compile_many(self, name, source, serializer):
+        field = self.model._meta.get_field(source)
+        if not field.many_to_many:
+            raise Unsupported(field)
+        fields = [
+            (sub, sub_field.source, plain_field(sub_field))
+            for sub, sub_field in serializer.fields.items()
+        ]
+        self.related.append((name, field, fields))
+        return lambda row: row[name]
+
+    def values(self, queryset, extra=()):
+        """Переводит кверисет на выборку только нужных столбцов;
+        `extra` - столбцы, нужные не сериализатору, а, например, пагинации.
+        """
+        return queryset.prefetch_related(None).values(
+            *self.columns.union(extra)
+        )
+
+    def load_related(self, rows):
+        """Добавляет в строки значения связей многие-ко-многим тем же
+        запросом и в том же порядке, что и prefetch_related.
+        """
+        by_pk = {}
+        for row in rows:
+            for name, _, _ in self.related:
+                row[name] = []
+            by_pk[row[self.pk]] = row
+        for name, field, fields in self.related:
+            lookup = field.related_query_name()
+            for values in field.related_model.objects.filter(**{
+                f'{lookup}__in': list(by_pk)
+            }).values_list(lookup, *(key for _, key, _ in fields)):
+                by_pk[values[0]][name].append({
+                    sub: None if value is None else convert(value)
+                    for (sub, _, convert), value in zip(fields, values[1:])
+                })
+
+    def serialize(self, rows):
+        rows = list(rows)
+        if self.related and rows:
+            self.load_related(rows)
+        accessors = self.accessors
+        return [
+            {name: accessor(row) for name, accessor in accessors}
+            for row in rows
+        ]
@@ -1,6 +1,11 @@
+from django.conf import settings
+from django.db import connections, router
+from django.utils.encoding import smart_str
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.models import (SCORE_FIELDS, SCORES, Category, Comment, Genre,
+                            GenreTitle, Review, Title)
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -15,27 +20,228 @@ class GenreSerializer(serializers.ModelSerializer):
         model = Genre
 
 
+class ScoreHistogramField(serializers.Field):
+    """Гистограмма оценок произведения: {оценка: число отзывов}.
+    Читает хранимые счётчики из столбцов `columns`.
+    """
+
+    columns = SCORE_FIELDS
+
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, title):
+        return self.from_values(
+            getattr(title, column) for column in self.columns
+        )
+
+    def from_values(self, values):
+        return dict(zip(map(str, SCORES), values))
+
+
 class TitleReadOnlySerializer(serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     genre = GenreSerializer(read_only=True, many=True)
     rating = serializers.IntegerField(read_only=True)
+    reviews_count = serializers.IntegerField(
+        source='rating_count', read_only=True
+    )
+    scores = ScoreHistogramField()
 
     class Meta:
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count', *SCORE_FIELDS)
         model = Title
 
 
+SLUG_LOOKUP = 'slug_lookup'
+
+
+def find_by_slugs(field, slugs):
+    """Возвращает словарь {слаг: объект} для слагов поля `field`.
+    Если список произведений уже загрузил объекты для всех своих
+    элементов, они берутся из `context['slug_lookup']`.
+    """
+    preloaded = field.context.get(SLUG_LOOKUP, {}).get(field.queryset.model)
+    if preloaded is not None:
+        return preloaded
+    return {
+        getattr(obj, field.slug_field): obj
+        for obj in field.get_queryset().filter(**{
+            f'{field.slug_field}__in': [str(slug) for slug in slugs]
+        })
+    }
+
+
+class LookupSlugRelatedField(serializers.SlugRelatedField):
+    """SlugRelatedField, использующий объекты, загруженные списком."""
+
+    def to_internal_value(self, data):
+        if SLUG_LOOKUP not in self.context:
+            return super().to_internal_value(data)
+        found = find_by_slugs(self, [data])
+        if str(data) not in found:
+            self.fail(
+                'does_not_exist', slug_name=self.slug_field,
+                value=smart_str(data)
+            )
+        return found[str(data)]
+
+
+class SlugListRelatedField(serializers.ManyRelatedField):
+    """Список слагов, которые переводятся в объекты одним запросом IN,
+    а не запросом на каждый слаг. Ошибки те же, что у
+    `SlugRelatedField(many=True)`.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        child = self.child_relation
+        found = find_by_slugs(child, data)
+        objects = []
+        for item in data:
+            if str(item) not in found:
+                child.fail(
+                    'does_not_exist', slug_name=child.slug_field,
+                    value=smart_str(item)
+                )
+            objects.append(found[str(item)])
+        return objects
+
+
+class TitleListSerializer(serializers.ListSerializer):
+    """Создаёт или изменяет список произведений: слаги всех элементов
+    переводятся в объекты одним запросом на модель, а произведения и их
+    связи с жанрами записываются пачками.
+    При изменении `instance` - кверисет произведений, а каждый элемент
+    списка содержит `id` изменяемого произведения.
+    """
+
+    default_error_messages = {
+        'max_items': 'Нельзя изменить более {limit} произведений за запрос.',
+        'id_required': 'Укажите id произведения.',
+        'id_not_found': 'Произведение с id {value} не найдено.',
+        'id_duplicate': 'Произведение с id {value} указано повторно.',
+    }
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            if len(data) > settings.API_BULK_MAX_ITEMS:
+                message = self.error_messages['max_items'].format(
+                    limit=settings.API_BULK_MAX_ITEMS
+                )
+                raise serializers.ValidationError({
+                    api_settings.NON_FIELD_ERRORS_KEY: [message]
+                }, code='max_items')
+            if self.instance is not None:
+                self.titles = self.load_titles(data)
+            self.context[SLUG_LOOKUP] = self.load_slugs(data)
+        return super().to_internal_value(data)
+
+    def load_titles(self, data):
+        """Загружает одним запросом произведения, которые изменяет список,
+        в порядке его элементов.
+        """
+        ids = [item.get('id') if isinstance(item, dict) else None
+               for item in data]
+        found = self.instance.in_bulk([
+            pk for pk in ids if type(pk) is int
+        ])
+        errors, seen = [], set()
+        for pk in ids:
+            if type(pk) is not int:
+                errors.append({'id': [self.error_messages['id_required']]})
+            elif pk not in found:
+                errors.append({'id': [
+                    self.error_messages['id_not_found'].format(value=pk)
+                ]})
+            elif pk in seen:
+                errors.append({'id': [
+                    self.error_messages['id_duplicate'].format(value=pk)
+                ]})
+            else:
+                errors.append({})
+            seen.add(pk)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return [found[pk] for pk in ids]
+
+    def load_slugs(self, data):
+        lookup = {}
+        for name, field in self.child.fields.items():
+            many = isinstance(field, serializers.ManyRelatedField)
+            relation = field.child_relation if many else field
+            if field.read_only or not isinstance(
+                relation, serializers.SlugRelatedField
+            ):
+                continue
+            slugs = []
+            for item in data:
+                value = item.get(name) if isinstance(item, dict) else None
+                if many and isinstance(value, list):
+                    slugs.extend(value)
+                elif not many and value is not None:
+                    slugs.append(value)
+            lookup[relation.queryset.model] = find_by_slugs(relation, slugs)
+        return lookup
+
+    def create(self, validated_data):
+        genres = [item.pop('genre', ()) for item in validated_data]
+        titles = [Title(**item) for item in validated_data]
+        features = connections[router.db_for_write(Title)].features
+        if features.can_return_rows_from_bulk_insert:
+            Title.objects.bulk_create(titles)
+        else:
+            # bulk_create не возвращает id на этой СУБД (SQLite в Django
+            # 3.2), а они нужны для связей с жанрами.
+            for title in titles:
+                title.save()
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title=title, genre=genre)
+            for title, title_genres in zip(titles, genres)
+            for genre in dict.fromkeys(title_genres)
+        )
+        return titles
+
+    def update(self, instance, validated_data):
+        fields, genres = set(), {}
+        for title, item in zip(self.titles, validated_data):
+            item = dict(item)
+            if 'genre' in item:
+                genres[title.pk] = dict.fromkeys(item.pop('genre'))
+            for name, value in item.items():
+                setattr(title, name, value)
+            fields.update(item)
+        if fields:
+            Title.objects.bulk_update(self.titles, fields)
+        if genres:
+            GenreTitle.objects.filter(title_id__in=genres).delete()
+            GenreTitle.objects.bulk_create(
+                GenreTitle(title_id=pk, genre=genre)
+                for pk, title_genres in genres.items()
+                for genre in title_genres
+            )
+        return self.titles
+
+
 class TitleWriteSerializer(serializers.ModelSerializer):
-    category = serializers.SlugRelatedField(
+    category = LookupSlugRelatedField(
         queryset=Category.objects.all(), slug_field='slug'
     )
-    genre = serializers.SlugRelatedField(
-        queryset=Genre.objects.all(), slug_field='slug', many=True
+    genre = SlugListRelatedField(
+        child_relation=serializers.SlugRelatedField(
+            queryset=Genre.objects.all(), slug_field='slug'
+        )
     )
 
     class Meta:
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count', 'rating', *SCORE_FIELDS)
         model = Title
+        list_serializer_class = TitleListSerializer
 
 
 class BaseReviewSerializer(serializers.ModelSerializer):
@@ -44,8 +250,7 @@ class BaseReviewSerializer(serializers.ModelSerializer):
     """
 
     author = serializers.SlugRelatedField(
-        read_only=True, slug_field='username',
-        default=serializers.CurrentUserDefault()
+        read_only=True, slug_field='username'
     )
 
     class Meta:
@@ -61,7 +266,8 @@ class ReviewCreateSerializer(BaseReviewSerializer):
 
     def validate(self, attr):
         view = self.context['view']
-        if view.get_queryset().filter(author=view.request.user).exists():
+        reviews = view.get_title().reviews
+        if reviews.filter(author_id=view.request.user.pk).exists():
             raise serializers.ValidationError(
                 'Нельзя дать на произведение более одного отзыва.')
 
@@ -78,3 +284,23 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         exclude = ('review',)
+
+
+class AutocompleteQuerySerializer(serializers.Serializer):
+    """Параметры запроса автодополнения."""
+
+    TYPES = ('titles', 'genres', 'categories')
+
+    q = serializers.CharField(max_length=200)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+    type = serializers.CharField(required=False)
+
+    def validate_type(self, value):
+        types = [item for item in value.split(',') if item]
+        unknown = set(types) - set(self.TYPES)
+        if unknown:
+            raise serializers.ValidationError(
+                f'Неизвестные типы: {", ".join(sorted(unknown))}. '
+                f'Допустимые: {", ".join(self.TYPES)}.'
+            )
+        return types
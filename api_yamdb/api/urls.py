@@ -3,7 +3,7 @@ from rest_framework.routers import SimpleRouter
 
 from users.views import UserViewSet, send_confirmation_code, get_token
 from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ReviewViewSet, TitleViewSet)
+                    ReviewViewSet, TitleViewSet, get_suggestions)
 
 app_name = 'api'
 
@@ -37,4 +37,5 @@ urlpatterns = [
     path('v1/', include(router.urls)),
     path('v1/auth/signup/', send_confirmation_code),
     path('v1/auth/token/', get_token),
+    path('v1/autocomplete/', get_suggestions),
 ]
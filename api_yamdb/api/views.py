@@ -1,13 +1,23 @@
-from django.db.models import Avg
+from http import HTTPStatus
+
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.decorators import action, api_view
+from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
-from reviews.models import Category, Genre, Title
+from reviews.models import Category, Genre, Review, Title
+from users.authentication import get_user_instance
 from .filters import TitleFilter
-from .mixins import AttributesModelMixin
+from .autocomplete import autocomplete
+from .cache import invalidate
+from .mixins import (AttributesModelMixin, CachedResponseMixin,
+                     ConditionalGetMixin, RowListMixin, SparseFieldsMixin)
+from .pagination import PublishedPagination, TitlePagination
 from .permissions import ReviewCommentPermission, IsAdminOrReadOnly
 from .serializers import (
+    AutocompleteQuerySerializer,
     CategorySerializer,
     GenreSerializer,
     TitleReadOnlySerializer,
@@ -23,6 +33,7 @@ class CategoryViewSet(AttributesModelMixin):
 
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_namespace = 'categories'
 
 
 class GenreViewSet(AttributesModelMixin):
@@ -30,26 +41,83 @@ class GenreViewSet(AttributesModelMixin):
 
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_namespace = 'genres'
 
 
-class TitleViewSet(ModelViewSet):
+class TitleViewSet(SparseFieldsMixin, CachedResponseMixin, RowListMixin,
+                   ModelViewSet):
     """Возвращает список произведений. Доступно без токена."""
 
     permission_classes = (IsAdminOrReadOnly,)
-    queryset = Title.objects.annotate(rating=Avg('reviews__score')).all()
+    pagination_class = TitlePagination
+    queryset = Title.objects.order_by('pk')
+    select_related_fields = ('category',)
+    prefetch_related_fields = ('genre',)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
+    cache_namespace = 'titles'
+    cache_depends_on = ('categories', 'genres')
 
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return TitleReadOnlySerializer
         return TitleWriteSerializer
 
-
-class ReviewViewSet(ModelViewSet):
+    @action(methods=('post',), detail=False, url_path='bulk')
+    def bulk_create(self, request):
+        """Создаёт список произведений в одной транзакции. При ошибке
+        не создаётся ничего, а ошибки возвращаются по каждому элементу.
+        """
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            titles = serializer.save()
+            invalidate(self.cache_namespace)
+            autocomplete.invalidate(
+                self.cache_namespace, {title.pk: title for title in titles}
+            )
+        return Response(self.read_titles(titles), status=HTTPStatus.CREATED)
+
+    @bulk_create.mapping.patch
+    def bulk_update(self, request):
+        """Изменяет список произведений в одной транзакции. Элементы
+        находятся по `id`, остальные поля - как в PATCH-запросе к одному
+        произведению; `genre` заменяет жанры произведения.
+        """
+        serializer = self.get_serializer(
+            Title.objects.all(), data=request.data, many=True, partial=True
+        )
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            titles = serializer.save()
+            invalidate(self.cache_namespace, *(
+                f'{self.cache_namespace}:{title.pk}' for title in titles
+            ))
+            autocomplete.invalidate(self.cache_namespace, {
+                title.pk: title
+                for title, item in zip(titles, serializer.validated_data)
+                if 'name' in item
+            })
+        return Response(self.read_titles(titles))
+
+    def read_titles(self, titles):
+        """Сериализует произведения для ответа в порядке запроса."""
+        loaded = Title.objects.select_related('category').prefetch_related(
+            'genre'
+        ).in_bulk([title.pk for title in titles])
+        return TitleReadOnlySerializer(
+            [loaded[title.pk] for title in titles], many=True
+        ).data
+
+
+class ReviewViewSet(SparseFieldsMixin, ConditionalGetMixin, RowListMixin,
+                    ModelViewSet):
     """Обработчик CRUD-запросов к модели Review."""
 
     permission_classes = (ReviewCommentPermission,)
+    pagination_class = PublishedPagination
+    select_related_fields = ('author',)
+    required_fields = ('pub_date',)
 
     def get_serializer_class(self):
         """Возвращает требуемый класс сериализатора в зависимости от
@@ -66,19 +134,52 @@ class ReviewViewSet(ModelViewSet):
         return self.get_title().reviews.all()
 
     def perform_create(self, serializer):
-        """Создаёт объект модели (отзыв)."""
-        serializer.save(author=self.request.user, title=self.get_title())
+        """Создаёт объект модели (отзыв). Рейтинг и гистограмму оценок
+        произведения обновляют сигналы отзыва.
+        """
+        serializer.save(
+            author=get_user_instance(self.request.user),
+            title=self.get_title()
+        )
+
+    def perform_update(self, serializer):
+        """Изменяет отзыв; прежняя оценка блокируется до конца транзакции."""
+        with transaction.atomic():
+            serializer.save()
+
+    def perform_destroy(self, instance):
+        """Удаляет отзыв, исключая из рейтинга оценку, сохранённую в БД."""
+        with transaction.atomic():
+            instance.score = Review.objects.select_for_update().values_list(
+                'score', flat=True
+            ).get(pk=instance.pk)
+            instance.delete()
+
+    def get_etag_namespaces(self):
+        """Отзывы меняются вместе с версией своего произведения.
+        id приводится к числу, как в `invalidate`: `/titles/0002/` и
+        `/titles/2/` - одно пространство имён.
+        """
+        return (f'titles:{int(self.kwargs["title_id"])}', 'users')
 
     def get_title(self):
-        """Возвращает произведение, заданное в URL запроса."""
-        return get_object_or_404(Title, pk=self.kwargs['title_id'])
+        """Возвращает произведение, заданное в URL запроса.
+        Результат запоминается на время обработки запроса.
+        """
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(Title, pk=self.kwargs['title_id'])
+        return self._title
 
 
-class CommentViewSet(ModelViewSet):
+class CommentViewSet(SparseFieldsMixin, ConditionalGetMixin, RowListMixin,
+                     ModelViewSet):
     """Обработчик CRUD-запросов к модели Comment."""
 
     serializer_class = CommentSerializer
     permission_classes = (ReviewCommentPermission,)
+    pagination_class = PublishedPagination
+    select_related_fields = ('author',)
+    required_fields = ('pub_date',)
 
     def get_queryset(self):
         """Возвращает кверисет, состоящий из комментариев к отзыву,
@@ -88,9 +189,52 @@ class CommentViewSet(ModelViewSet):
 
     def perform_create(self, serializer):
         """Создаёт объект модели (комментарий)."""
-        serializer.save(author=self.request.user, review=self.get_review())
+        comment = serializer.save(
+            author=get_user_instance(self.request.user),
+            review=self.get_review()
+        )
+        invalidate(f'reviews:{comment.review_id}')
+
+    def perform_update(self, serializer):
+        """Изменяет комментарий."""
+        comment = serializer.save()
+        invalidate(f'reviews:{comment.review_id}')
+
+    def perform_destroy(self, instance):
+        """Удаляет комментарий."""
+        instance.delete()
+        invalidate(f'reviews:{instance.review_id}')
+
+    def get_etag_namespaces(self):
+        """Комментарии меняются вместе с версиями отзыва и произведения."""
+        return (
+            f'titles:{int(self.kwargs["title_id"])}',
+            f'reviews:{int(self.kwargs["review_id"])}',
+            'users',
+        )
 
     def get_review(self):
-        """Возвращает отзыв, заданный в URL запроса."""
-        title = get_object_or_404(Title, pk=self.kwargs['title_id'])
-        return get_object_or_404(title.reviews, pk=self.kwargs['review_id'])
+        """Возвращает отзыв, заданный в URL запроса, одним запросом
+        с проверкой принадлежности произведению.
+        Результат запоминается на время обработки запроса.
+        """
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review,
+                pk=self.kwargs['review_id'],
+                title_id=self.kwargs['title_id'],
+            )
+        return self._review
+
+
+@api_view(['GET'])
+def get_suggestions(request):
+    """Возвращает произведения, жанры и категории, название или slug
+    которых начинается с параметра `q`. Доступно без токена.
+    """
+    serializer = AutocompleteQuerySerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    params = serializer.validated_data
+    return Response(autocomplete.search(
+        params['q'], params['limit'], params.get('type')
+    ))
@@ -36,7 +36,19 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.RoleJWTAuthentication',
+    ],
+
+    # orjson-backed JSON when installed, the stdlib json module otherwise.
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
 
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
@@ -48,8 +60,14 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# How long a process trusts its cached copy of User.tokens_valid_after and
+# the user role before reading them from the database again; bounds how
+# long a demoted user keeps old rights in other processes, in seconds.
+AUTH_USER_CACHE_TIMEOUT = 5
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'api.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -90,6 +108,54 @@ DATABASES = {
 }
 
 
+# Cache
+
+# Cached responses and the version counters that invalidate them (response
+# cache, ETags, autocomplete indexes) must be shared by every process that
+# serves the API: a per-process cache such as LocMemCache would miss writes
+# made by other workers. The file cache is shared by the workers of one
+# host; deployments on several hosts need memcached or another networked
+# backend configured here for all of them.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+    }
+}
+
+# Lifetime of cached API responses, in seconds.
+API_CACHE_TIMEOUT = 60 * 10
+
+# Count response cache hits and misses (see the cache_stats command).
+# Every cached GET then updates a counter in the cache.
+API_CACHE_STATS = True
+
+# Serialize list pages from values() rows instead of model instances.
+API_ROW_SERIALIZATION = True
+
+# Largest list accepted by POST /api/v1/titles/bulk/.
+API_BULK_MAX_ITEMS = 1000
+
+# Most ids accepted by the ?ids= filter of /api/v1/titles/; the found titles
+# are returned on one page regardless of PAGE_SIZE.
+API_MAX_IDS = 1000
+
+# Response compression: brotli when the brotli package is installed and the
+# client accepts it, gzip otherwise. Smaller responses are sent as is.
+# text/html is left out on purpose: browsable API pages carry the CSRF token
+# next to reflected query strings, which compression exposes to BREACH.
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_CONTENT_TYPES = (
+    'application/json',
+    'application/javascript',
+    'text/css',
+    'text/javascript',
+    'text/plain',
+)
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 4
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -132,6 +198,14 @@ AUTH_USER_MODEL = 'users.User'
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
+# Confirmation emails are queued and sent by a background thread in batches
+# over one connection; after an error only the unsent emails of the batch
+# are retried. EAGER sends them synchronously within the request.
+EMAIL_OUTBOX_EAGER = False
+EMAIL_OUTBOX_BATCH_SIZE = 50
+EMAIL_OUTBOX_RETRIES = 3
+EMAIL_OUTBOX_RETRY_DELAY = 1
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 HOST_EMAIL = 'webmaster@localhost'
@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.db.models.signals import (post_delete, post_migrate, post_save,
+                                      pre_save)
 
 
 class ReviewsConfig(AppConfig):
     name = 'reviews'
     verbose_name = 'Отзывы'
+
+    def ready(self):
+        from .models import count_score, discount_score, remember_score
+        from .search import install_search
+        post_migrate.connect(install_search, sender=self)
+        review = self.get_model('Review')
+        pre_save.connect(remember_score, sender=review)
+        post_save.connect(count_score, sender=review)
+        post_delete.connect(discount_score, sender=review)
@@ -1,34 +1,269 @@
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from csv import DictReader
+from itertools import islice
+from pathlib import Path
 
-from django.core.management.base import BaseCommand
+import django
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from api.autocomplete import autocomplete
+from api.cache import invalidate
 from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
 from users.models import User
 
 MODEL_TO_CSV = {
-    User: 'static/data/users.csv',
-    Genre: 'static/data/genre.csv',
-    Category: 'static/data/category.csv',
-    Title: 'static/data/titles.csv',
-    GenreTitle: 'static/data/genre_title.csv',
-    Review: 'static/data/review.csv',
-    Comment: 'static/data/comments.csv'
+    User: 'users.csv',
+    Genre: 'genre.csv',
+    Category: 'category.csv',
+    Title: 'titles.csv',
+    GenreTitle: 'genre_title.csv',
+    Review: 'review.csv',
+    Comment: 'comments.csv'
 }
 
 
+class RowError(ValueError):
+    """Строка csv файла не прошла проверку."""
+
+
+def dependency_levels(models):
+    """Разбивает модели на уровни по внешним ключам.
+    Модели одного уровня не ссылаются друг на друга и загружаются
+    одновременно; каждый уровень зависит только от предыдущих.
+    """
+    pending = {
+        model: {
+            field.related_model for field in model._meta.concrete_fields
+            if field.is_relation
+            and field.related_model in models
+            and field.related_model is not model
+        }
+        for model in models
+    }
+    levels = []
+    while pending:
+        level = [model for model, depends in pending.items() if not depends]
+        if not level:
+            raise CommandError(
+                f'Circular foreign keys between {list(pending)}'
+            )
+        levels.append(level)
+        for model in level:
+            del pending[model]
+        for depends in pending.values():
+            depends.difference_update(level)
+    return levels
+
+
+def read_rows(path, skip=0):
+    """Лениво читает строки csv файла, пропуская первые `skip` строк."""
+    with open(path, encoding='utf8', newline='') as file:
+        yield from islice(DictReader(file), skip, None)
+
+
+def make_instance(model, row):
+    """Создаёт объект модели из строки csv файла.
+    Колонки внешних ключей (например, `author`) переносятся в `<поле>_id`.
+    """
+    for field in model._meta.concrete_fields:
+        if field.is_relation and field.name in row:
+            row[field.attname] = row.pop(field.name)
+    return model(**row)
+
+
+def clean_row(model, row):
+    """Проверяет и приводит к нужным типам значения колонок строки.
+    Внешние ключи не проверяются: для этого нужен запрос к БД.
+    """
+    instance = make_instance(model, row)
+    fields = model._meta.concrete_fields
+    instance.clean_fields(exclude=[
+        field.name for field in fields
+        if field.is_relation or field.attname not in row
+    ])
+    return {
+        field.attname: getattr(instance, field.attname)
+        for field in fields if field.attname in row
+    }
+
+
+def parse_batch(label, first_row, rows):
+    """Разбирает пачку строк; выполняется в процессе-обработчике."""
+    model = apps.get_model(label)
+    try:
+        return [clean_row(model, row) for row in rows]
+    except (ValidationError, TypeError, ValueError) as error:
+        raise RowError(
+            f'{label}: invalid row in batch starting at row {first_row}: '
+            f'{error}'
+        )
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def ordered_map(executor, function, arguments, window):
+    """Выполняет функцию в пуле, держа в работе не более `window` задач,
+    и возвращает результаты в исходном порядке.
+    """
+    if executor is None:
+        yield from (function(*args) for args in arguments)
+        return
+    pending = deque()
+    for args in arguments:
+        pending.append(executor.submit(function, *args))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+class Checkpoint:
+    """Хранит число загруженных строк каждого файла для продолжения
+    прерванного импорта.
+    Контрольная точка пишется после фиксации пачки, поэтому при
+    продолжении первая пачка каждого файла могла быть уже загружена.
+    """
+
+    def __init__(self, path, resume):
+        self.path = Path(path)
+        self.resume = resume
+        self.done = {}
+        if resume and self.path.exists():
+            self.done = json.loads(self.path.read_text(encoding='utf8'))
+
+    def get(self, model):
+        return self.done.get(model._meta.label, 0)
+
+    def save(self, model, rows):
+        self.done[model._meta.label] = rows
+        self.path.write_text(json.dumps(self.done), encoding='utf8')
+
+    def clear(self):
+        if self.path.exists():
+            self.path.unlink()
+
+
 class Command(BaseCommand):
     """Импортирует данные из csv файлов в БД."""
 
     help = 'Import data to database from .csv files'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--data-dir', default=settings.BASE_DIR / 'static/data',
+            help='Directory with the .csv files',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of rows inserted per transaction',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Processes that parse and validate batches '
+                 '(1 parses in the current process)',
+        )
+        parser.add_argument(
+            '--checkpoint', default='load_from_csv.checkpoint.json',
+            help='File that records progress after every committed batch',
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Continue an interrupted import from the checkpoint',
+        )
+
     def handle(self, *args, **options):
-        for model in MODEL_TO_CSV:
-            objs = []
-            for row in DictReader(open(MODEL_TO_CSV[model], encoding='utf8')):
-                if 'category' in row:
-                    row['category_id'] = row['category']
-                    del row['category']
-                if 'author' in row:
-                    row['author_id'] = row['author']
-                    del row['author']
-                objs.append(model(**row))
-            model.objects.bulk_create(objs)
+        checkpoint = Checkpoint(options['checkpoint'], options['resume'])
+        workers = options['workers']
+        executor = None
+        if workers > 1:
+            connections.close_all()
+            executor = ProcessPoolExecutor(
+                max_workers=workers, initializer=django.setup
+            )
+        try:
+            for level in dependency_levels(list(MODEL_TO_CSV)):
+                self.load_level(
+                    level, executor, max(2, workers) * 2, checkpoint,
+                    Path(options['data_dir']), options['batch_size']
+                )
+        except RowError as error:
+            raise CommandError(error)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+        Title.objects.rebuild_rating()
+        # bulk_create не отправляет сигналы: ответы всех эндпойнтов зависят
+        # от версий загруженных моделей, и они сбрасываются здесь.
+        invalidate('titles', 'categories', 'genres', 'users')
+        autocomplete.invalidate_all()
+        checkpoint.clear()
+
+    def load_level(self, level, executor, window, checkpoint, data_dir,
+                   batch_size):
+        """Загружает независимые друг от друга файлы одновременно:
+        пачки всех файлов уровня разбираются в пуле, а вставляются
+        в БД по очереди, как только готовы.
+        """
+        streams = {
+            model: self.parsed_batches(
+                model, data_dir / MODEL_TO_CSV[model], checkpoint.get(model),
+                executor, window, batch_size
+            )
+            for model in level
+        }
+        # Строки несут явные id: повторно вставленные строки пропускаются.
+        replayed = set(level) if checkpoint.resume else set()
+        started = time.perf_counter()
+        while streams:
+            for model, stream in list(streams.items()):
+                objs = next(stream, None)
+                if objs is None:
+                    del streams[model]
+                    continue
+                with transaction.atomic():
+                    model.objects.bulk_create(
+                        [model(**values) for values in objs],
+                        ignore_conflicts=model in replayed,
+                    )
+                replayed.discard(model)
+                checkpoint.save(model, checkpoint.get(model) + len(objs))
+        self.stdout.write(
+            f'{", ".join(model.__name__ for model in level)}: '
+            f'done in {time.perf_counter() - started:.2f}s'
+        )
+
+    def parsed_batches(self, model, path, skipped, executor, window,
+                       batch_size):
+        """Возвращает разобранные пачки строк файла по порядку."""
+        label = model._meta.label
+        started = time.perf_counter()
+        loaded = 0
+        for objs in ordered_map(executor, parse_batch, (
+            (label, skipped + index * batch_size + 1, batch)
+            for index, batch in enumerate(
+                batches(read_rows(path, skip=skipped), batch_size)
+            )
+        ), window):
+            loaded += len(objs)
+            yield objs
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{model.__name__}: {loaded} rows in {elapsed:.2f}s '
+            f'({loaded / elapsed if elapsed else 0:.0f} rows/s)'
+            + (f', {skipped} rows skipped by checkpoint' if skipped else '')
+        )
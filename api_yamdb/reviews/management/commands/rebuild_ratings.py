@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F, Q
+
+from api.cache import invalidate
+from reviews.models import SCORE_FIELDS, Title
+
+
+class Command(BaseCommand):
+    """Сверяет и пересчитывает хранимые рейтинги и гистограммы оценок
+    произведений.
+    """
+
+    help = 'Verify and rebuild stored title ratings from reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report titles with drifted ratings or score '
+                 'histograms, do not fix them',
+        )
+
+    def handle(self, *args, **options):
+        condition = Q()
+        for field in ('rating_sum', 'rating_count', *SCORE_FIELDS):
+            condition |= ~Q(**{field: F(f'actual_{field}')})
+        drifted = Title.objects.with_actual_rating().filter(
+            condition
+        ).values_list('pk', flat=True)
+        if options['check']:
+            drifted = list(drifted)
+            if drifted:
+                raise CommandError(
+                    f'Stored rating differs from reviews for {len(drifted)} '
+                    f'titles: {drifted[:20]}'
+                )
+            self.stdout.write(self.style.SUCCESS('All ratings are in sync'))
+            return
+        with transaction.atomic():
+            drifted = list(drifted)
+            updated = Title.objects.rebuild_rating()
+            # update() не отправляет сигналы: кэш сбрасывается явно.
+            invalidate('titles', *(f'titles:{pk}' for pk in drifted))
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt ratings for {updated} titles')
+        )
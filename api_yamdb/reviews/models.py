@@ -1,6 +1,9 @@
+from collections import Counter
+
 from django.contrib import auth
 from django.core import validators
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models.functions import Cast, Coalesce, NullIf
 
 from .validators import validate_year
 
@@ -35,6 +38,94 @@ class Genre(models.Model):
         return f'{self.name} {self.slug}'
 
 
+# Допустимые оценки отзывов.
+SCORES = range(1, 11)
+
+
+def score_field(score):
+    """Имя поля произведения с числом отзывов с оценкой `score`."""
+    return f'score_{score}'
+
+
+SCORE_FIELDS = tuple(score_field(score) for score in SCORES)
+
+
+def score_counter(score):
+    return models.PositiveIntegerField(
+        f'Число оценок {score}', default=0, editable=False
+    )
+
+
+def average(total, count):
+    """Выражение средней оценки; NULL, если оценок нет."""
+    return Cast(total, models.FloatField()) / NullIf(count, 0)
+
+
+class TitleQuerySet(models.QuerySet):
+    """Кверисет произведений с операциями над хранимыми агрегатами оценок."""
+
+    def shift_scores(self, added=None, removed=None):
+        """Атомарно учитывает добавленную и убранную оценки в гистограмме,
+        сумме и количестве оценок произведений и пересчитывает по ним
+        средний рейтинг.
+        """
+        deltas = Counter()
+        if added is not None:
+            deltas[added] += 1
+        if removed is not None:
+            deltas[removed] -= 1
+        rating_sum = models.F('rating_sum') + sum(
+            score * delta for score, delta in deltas.items()
+        )
+        rating_count = models.F('rating_count') + sum(deltas.values())
+        return self.update(
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            rating=average(rating_sum, rating_count),
+            **{
+                score_field(score): models.F(score_field(score)) + delta
+                for score, delta in deltas.items() if delta
+            }
+        )
+
+    def with_actual_rating(self):
+        """Аннотирует произведения агрегатами, посчитанными по отзывам."""
+        return self.annotate(
+            actual_rating_sum=Coalesce(models.Sum('reviews__score'), 0),
+            actual_rating_count=models.Count('reviews'),
+            **{
+                f'actual_{score_field(score)}': models.Count(
+                    'reviews', filter=models.Q(reviews__score=score)
+                )
+                for score in SCORES
+            }
+        )
+
+    def rebuild_rating(self):
+        """Пересчитывает хранимые агрегаты оценок по таблице отзывов."""
+        reviews = Review.objects.filter(
+            title=models.OuterRef('pk')
+        ).order_by().values('title')
+
+        def count(reviews):
+            return Coalesce(models.Subquery(
+                reviews.annotate(total=models.Count('pk')).values('total')
+            ), 0)
+
+        updated = self.update(
+            rating_sum=Coalesce(models.Subquery(
+                reviews.annotate(total=models.Sum('score')).values('total')
+            ), 0),
+            rating_count=count(reviews),
+            **{
+                score_field(score): count(reviews.filter(score=score))
+                for score in SCORES
+            }
+        )
+        self.update(rating=average('rating_sum', 'rating_count'))
+        return updated
+
+
 class Title(models.Model):
     """Модель произведения."""
 
@@ -58,10 +149,39 @@ class Title(models.Model):
         through='GenreTitle',
         verbose_name='жанр'
     )
+    rating_sum = models.PositiveIntegerField(
+        'Сумма оценок', default=0, editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        'Количество оценок', default=0, editable=False
+    )
+    rating = models.FloatField(
+        'Рейтинг', null=True, blank=True, editable=False
+    )
+    # Гистограмма оценок: число отзывов с каждой оценкой.
+    score_1 = score_counter(1)
+    score_2 = score_counter(2)
+    score_3 = score_counter(3)
+    score_4 = score_counter(4)
+    score_5 = score_counter(5)
+    score_6 = score_counter(6)
+    score_7 = score_counter(7)
+    score_8 = score_counter(8)
+    score_9 = score_counter(9)
+    score_10 = score_counter(10)
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = [
+            models.Index(fields=('year',), name='title_year_idx'),
+            models.Index(
+                fields=('category', 'year'), name='title_category_year_idx'
+            ),
+            models.Index(fields=('rating',), name='title_rating_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -80,6 +200,13 @@ class GenreTitle(models.Model):
         null=True
     )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=('genre', 'title'), name='genretitle_genre_title_idx'
+            ),
+        ]
+
 
 class Published(models.Model):
     """Базовый класс для публикаций (отзывов, комментариев)."""
@@ -105,9 +232,9 @@ class Review(Published):
         'Оценка',
         validators=[
             validators.MaxValueValidator(
-                10, message='Оценка не может быть больше 10.'),
+                SCORES[-1], message='Оценка не может быть больше 10.'),
             validators.MinValueValidator(
-                1, message='Оценка не может быть меньше 1.'),
+                SCORES[0], message='Оценка не может быть меньше 1.'),
         ]
     )
     title = models.ForeignKey(
@@ -120,6 +247,12 @@ class Review(Published):
     class Meta(Published.Meta):
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
+        indexes = [
+            models.Index(
+                fields=('title', '-pub_date', '-id'),
+                name='review_title_pub_date_idx',
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['author', 'title'],
@@ -144,6 +277,55 @@ class Comment(Published):
     class Meta(Published.Meta):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=('review', '-pub_date', '-id'),
+                name='comment_review_pub_date_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'Комментарий {self.pk} на отзыв {self.review.pk}'
+
+
+def remember_score(sender, instance, raw=False, update_fields=None,
+                   **kwargs):
+    """Обработчик pre_save отзыва: запоминает оценку, сохранённую в БД.
+    В транзакции строка блокируется до её конца, чтобы параллельное
+    изменение оценки не было учтено в рейтинге дважды.
+    """
+    if raw or instance._state.adding or (
+        update_fields is not None and 'score' not in update_fields
+    ):
+        return
+    reviews = sender.objects.filter(pk=instance.pk)
+    if transaction.get_connection(router.db_for_write(sender)).in_atomic_block:
+        reviews = reviews.select_for_update()
+    instance._saved_score = reviews.values_list('score', flat=True).first()
+
+
+def count_score(sender, instance, created, raw=False, **kwargs):
+    """Обработчик post_save отзыва: учитывает новую или изменённую оценку
+    в рейтинге и гистограмме оценок произведения.
+    """
+    if raw:
+        return
+    if created:
+        Title.objects.filter(pk=instance.title_id).shift_scores(
+            added=instance.score
+        )
+        return
+    saved = instance.__dict__.pop('_saved_score', instance.score)
+    if saved != instance.score:
+        Title.objects.filter(pk=instance.title_id).shift_scores(
+            added=instance.score, removed=saved
+        )
+
+
+def discount_score(sender, instance, **kwargs):
+    """Обработчик post_delete отзыва: исключает оценку из рейтинга.
+    Срабатывает и при каскадном удалении, например, вместе с автором.
+    """
+    Title.objects.filter(pk=instance.title_id).shift_scores(
+        removed=instance.score
+    )
@@ -0,0 +1,155 @@
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, ExpressionWrapper, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+WORD = re.compile(r'\w+')
+
+
+class SearchBackend:
+    """Поиск произведений без полнотекстового индекса.
+    Используется для СУБД, для которых нет специального бэкенда.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def install(self):
+        """Создаёт в БД структуры, необходимые для поиска."""
+
+    def search(self, queryset, query):
+        """Оставляет в кверисете произведения, подходящие под запрос."""
+        words = WORD.findall(query)
+        if not words:
+            return queryset.none()
+        condition = Q()
+        for word in words:
+            condition &= (
+                Q(name__icontains=word) | Q(description__icontains=word)
+            )
+        return queryset.filter(condition)
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """Поиск по индексу FTS5 с ранжированием bm25.
+    Индекс хранит только токены (external content) и поддерживается
+    триггерами, поэтому синхронен с таблицей при любом способе записи.
+    """
+
+    table = 'reviews_title_fts'
+    # Совпадение в названии весит больше, чем в описании.
+    rank = f'-bm25({table}, 10.0, 1.0)'
+    statements = (
+        f'''CREATE TRIGGER IF NOT EXISTS {table}_ai
+        AFTER INSERT ON reviews_title BEGIN
+            INSERT INTO {table}(rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END''',
+        f'''CREATE TRIGGER IF NOT EXISTS {table}_ad
+        AFTER DELETE ON reviews_title BEGIN
+            INSERT INTO {table}({table}, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+        END''',
+        f'''CREATE TRIGGER IF NOT EXISTS {table}_au
+        AFTER UPDATE OF name, description ON reviews_title BEGIN
+            INSERT INTO {table}({table}, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO {table}(rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END''',
+    )
+
+    def install(self):
+        with self.connection.cursor() as cursor:
+            if self.table in self.connection.introspection.table_names(
+                cursor
+            ):
+                return
+            cursor.execute(
+                f'''CREATE VIRTUAL TABLE {self.table} USING fts5(
+                    name, description,
+                    content='reviews_title', content_rowid='id'
+                )'''
+            )
+            for statement in self.statements:
+                cursor.execute(statement)
+            cursor.execute(
+                f"INSERT INTO {self.table}({self.table}) VALUES ('rebuild')"
+            )
+
+    def search(self, queryset, query):
+        words = WORD.findall(query)
+        if not words:
+            return queryset.none()
+        match = ' '.join(f'"{word}"' for word in words)
+        fts = f'FROM {self.table} WHERE {self.table} MATCH %s'
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid {fts}', (match,))
+        ).annotate(
+            search_rank=RawSQL(
+                f'SELECT {self.rank} {fts} '
+                f'AND {self.table}.rowid = "reviews_title"."id"',
+                (match,), output_field=FloatField(),
+            ),
+        ).order_by('-search_rank', 'pk')
+
+
+class PostgreSQLSearchBackend(SearchBackend):
+    """Поиск по tsvector с GIN-индексом по тому же выражению."""
+
+    vector = (
+        "setweight(to_tsvector('simple', coalesce({name}, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce({description}, '')), 'B')"
+    )
+
+    def install(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS reviews_title_search_idx '
+                'ON reviews_title USING GIN (('
+                + self.vector.format(name='name', description='description')
+                + '))'
+            )
+
+    def search(self, queryset, query):
+        if not WORD.search(query):
+            return queryset.none()
+        vector = self.vector.format(
+            name='"reviews_title"."name"',
+            description='"reviews_title"."description"',
+        )
+        tsquery = "websearch_to_tsquery('simple', %s)"
+        return queryset.annotate(
+            search_match=ExpressionWrapper(
+                RawSQL(f'({vector}) @@ {tsquery}', (query,)),
+                output_field=BooleanField(),
+            ),
+            search_rank=RawSQL(
+                f'ts_rank({vector}, {tsquery})', (query,),
+                output_field=FloatField(),
+            ),
+        ).filter(search_match=True).order_by('-search_rank', 'pk')
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgreSQLSearchBackend,
+}
+
+
+def get_backend(using='default'):
+    connection = connections[using]
+    return BACKENDS.get(connection.vendor, SearchBackend)(connection)
+
+
+def install_search(sender, using='default', **kwargs):
+    """Обработчик post_migrate: создаёт поисковый индекс."""
+    get_backend(using).install()
+
+
+def search_titles(queryset, query):
+    """Возвращает произведения, найденные по названию и описанию,
+    от более релевантных к менее релевантным.
+    """
+    return get_backend(queryset.db).search(queryset, query)
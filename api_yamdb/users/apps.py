@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        from .authentication import forget_user, revoke_tokens
+        user = self.get_model('User')
+        post_save.connect(revoke_tokens, sender=user)
+        post_delete.connect(forget_user, sender=user)
@@ -0,0 +1,194 @@
+import math
+import time
+from threading import Lock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+User = get_user_model()
+
+# Поля пользователя, которые копируются в токен.
+CLAIM_FIELDS = ('username', 'role', 'is_superuser')
+# Поля, при изменении которых claims выданных токенов устаревают.
+REVOKING_FIELDS = (*CLAIM_FIELDS, 'is_active')
+
+
+class RoleAccessToken(AccessToken):
+    """Access-токен с именем и ролью пользователя в claims."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for field in CLAIM_FIELDS:
+            token[field] = getattr(user, field)
+        return token
+
+
+class RoleTokenUser(TokenUser):
+    """Пользователь, построенный по claims токена без запроса к БД."""
+
+    @cached_property
+    def role(self):
+        return self.token.get('role', User.USER)
+
+    @property
+    def is_admin(self):
+        return self.is_superuser or self.role == User.ADMIN
+
+    @property
+    def is_moderator(self):
+        return self.role == User.MODERATOR
+
+    @cached_property
+    def instance(self):
+        """Объект модели с полями из claims для внешних ключей;
+        остальные поля загрузятся из БД при обращении к ним.
+        """
+        loaded = {
+            'id': self.id, 'username': self.username, 'role': self.role,
+            'is_superuser': self.is_superuser,
+        }
+        fields = [
+            field.attname for field in User._meta.concrete_fields
+            if field.attname in loaded
+        ]
+        return User.from_db(
+            DEFAULT_DB_ALIAS, fields, [loaded[name] for name in fields]
+        )
+
+
+def get_user_instance(user):
+    """Возвращает объект модели User для текущего пользователя запроса."""
+    return user.instance if isinstance(user, RoleTokenUser) else user
+
+
+class UserStateCache:
+    """Кэш в памяти процесса с коротким временем жизни
+    (AUTH_USER_CACHE_TIMEOUT): время последней смены роли пользователя
+    из `User.tokens_valid_after` и claims, загруженные из БД для токенов
+    без актуальных claims.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.entries = {}
+
+    def get(self, key, load):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+        value = load()
+        with self.lock:
+            self.entries[key] = (now + settings.AUTH_USER_CACHE_TIMEOUT, value)
+        return value
+
+    def discard(self, user_id):
+        with self.lock:
+            self.entries.pop(('changed', user_id), None)
+            self.entries.pop(('claims', user_id), None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+states = UserStateCache()
+
+
+def changed_at(user_id):
+    """Время последней смены роли или имени пользователя (timestamp),
+    0, если их не было, и бесконечность, если пользователя нет.
+    """
+    def load():
+        found = User.objects.filter(pk=user_id).values_list(
+            'tokens_valid_after', flat=True
+        )
+        for valid_after in found:
+            return valid_after.timestamp() if valid_after else 0
+        return math.inf
+    return states.get(('changed', user_id), load)
+
+
+def load_claims(user_id):
+    claims = User.objects.filter(
+        pk=user_id, is_active=True
+    ).values('id', *CLAIM_FIELDS).first()
+    if claims is not None:
+        claims[api_settings.USER_ID_CLAIM] = claims.pop('id')
+    return claims
+
+
+def claims_changed(instance, update_fields):
+    """Проверяет, изменились ли с загрузки из БД поля из REVOKING_FIELDS.
+    Неотложенное поле, которого не было при загрузке, считается
+    изменённым.
+    """
+    loaded = getattr(instance, '_loaded_values', {})
+    fields = REVOKING_FIELDS if update_fields is None else (
+        set(update_fields) & set(REVOKING_FIELDS)
+    )
+    return any(
+        name in instance.__dict__ and (
+            name not in loaded or loaded[name] != instance.__dict__[name]
+        )
+        for name in fields
+    )
+
+
+def revoke_tokens(sender, instance, created=False, update_fields=None,
+                  raw=False, **kwargs):
+    """Обработчик post_save пользователя: если изменились роль, имя или
+    активность, claims токенов, выданных раньше, перестают считаться
+    актуальными, и роль для них берётся из БД. Момент смены хранится
+    в `User.tokens_valid_after`, поэтому его видят все процессы.
+    """
+    if not created and not raw and claims_changed(instance, update_fields):
+        instance.tokens_valid_after = timezone.now()
+        sender.objects.filter(pk=instance.pk).update(
+            tokens_valid_after=instance.tokens_valid_after
+        )
+        states.discard(instance.pk)
+    instance._loaded_values = {
+        name: instance.__dict__[name]
+        for name in REVOKING_FIELDS if name in instance.__dict__
+    }
+
+
+def forget_user(sender, instance, **kwargs):
+    """Обработчик post_delete пользователя."""
+    states.discard(instance.pk)
+
+
+class RoleJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация без запроса пользователя из БД.
+    Роль берётся из claims токена, если они выданы после последней смены
+    роли пользователя; иначе (старый токен или токен без claims) - из БД
+    через короткоживущий кэш процесса.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                'Token contained no recognizable user identification'
+            )
+        if 'role' in validated_token and (
+            validated_token.get('iat', 0) > changed_at(user_id)
+        ):
+            return RoleTokenUser(validated_token)
+        claims = states.get(('claims', user_id), lambda: load_claims(user_id))
+        if claims is None:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+        return RoleTokenUser(claims)
@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-18 19:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='tokens_valid_after',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Claims токенов, выданных раньше, не считаются актуальными', null=True, verbose_name='Смена прав'),
+        ),
+    ]
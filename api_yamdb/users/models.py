@@ -16,7 +16,8 @@ class User(AbstractUser):
 
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
-        if self.is_superuser:
+        # Отложенное поле не читаем: это был бы запрос на каждый объект.
+        if self.__dict__.get('is_superuser'):
             self.role = 'admin'
 
     email = models.EmailField(
@@ -41,8 +42,23 @@ class User(AbstractUser):
         help_text='Статус пользователя'
     )
 
+    tokens_valid_after = models.DateTimeField(
+        'Смена прав',
+        null=True,
+        blank=True,
+        editable=False,
+        help_text='Claims токенов, выданных раньше, не считаются актуальными'
+    )
+
     REQUIRED_FIELDS = ('email', )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Значения при загрузке: по ним видно, изменилась ли роль.
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
     def __str__(self) -> str:
         """Переопределённый метод __str__"""
         return self.username
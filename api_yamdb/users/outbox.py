@@ -0,0 +1,94 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.mail import get_connection
+
+logger = logging.getLogger(__name__)
+
+
+class Outbox:
+    """Очередь исходящих писем.
+    Письма отправляются фоновым потоком пачками через одно соединение
+    с почтовым сервером; при ошибке повторяются только неотправленные
+    письма пачки. В режиме EMAIL_OUTBOX_EAGER письма отправляются сразу.
+    """
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.worker = None
+
+    def put(self, message):
+        """Ставит письмо в очередь и сразу возвращает управление."""
+        if settings.EMAIL_OUTBOX_EAGER:
+            self.send([message])
+            return
+        self.start()
+        self.queue.put(message)
+
+    def flush(self, timeout=None):
+        """Ждёт отправки всех писем из очереди."""
+        with self.queue.all_tasks_done:
+            return self.queue.all_tasks_done.wait_for(
+                lambda: not self.queue.unfinished_tasks, timeout
+            )
+
+    def start(self):
+        with self.lock:
+            if self.worker is None or not self.worker.is_alive():
+                self.worker = threading.Thread(
+                    target=self.run, name='email-outbox', daemon=True
+                )
+                self.worker.start()
+
+    def run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < settings.EMAIL_OUTBOX_BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.send(batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def send(self, messages):
+        """Отправляет пачку писем через одно соединение по одному письму,
+        чтобы знать, какие из них сервер уже принял. При ошибке соединение
+        открывается заново с растущей задержкой и отправляются только
+        оставшиеся письма: принятые не дублируются.
+        """
+        pending = deque(messages)
+        retries = settings.EMAIL_OUTBOX_RETRIES
+        for attempt in range(retries + 1):
+            try:
+                with get_connection(fail_silently=False) as connection:
+                    while pending:
+                        connection.send_messages([pending[0]])
+                        pending.popleft()
+                return
+            except Exception:
+                if not pending:
+                    # Все письма приняты, ошибка при закрытии соединения.
+                    return
+                if attempt == retries:
+                    logger.exception(
+                        'Failed to send %d of %d emails after %d attempts',
+                        len(pending), len(messages), attempt + 1
+                    )
+                    if settings.EMAIL_OUTBOX_EAGER:
+                        raise
+                    return
+                time.sleep(settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** attempt)
+
+
+outbox = Outbox()
+atexit.register(outbox.flush, timeout=10)
@@ -1,7 +1,7 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
-from users.validators import check_username, check_user_is_not_registred
+from users.validators import check_username, get_registered_user
 
 User = get_user_model()
 
@@ -70,14 +70,17 @@ class SignUpSerializer(serializers.Serializer):
     def validate(self, attrs):
         """
         Проверка, что пользователь не регистрируется
-        с занятым почтовым ящиком или юзернеймом
+        с занятым почтовым ящиком или юзернеймом.
+        Найденный пользователь с теми же данными
+        сохраняется в registered_user
         """
         email = attrs.get('email')
         username = attrs.get('username')
-        if not check_user_is_not_registred(
+        self.registered_user, taken = get_registered_user(
             email=email,
             username=username
-        ):
+        )
+        if taken:
             raise serializers.ValidationError(
                 {'ошибка регистрации':
                  f'Пользователь с таким {username} '
@@ -1,6 +1,7 @@
 import re
 
 from django.contrib.auth import get_user_model
+from django.db.models import Q
 
 User = get_user_model()
 
@@ -18,23 +19,15 @@ def check_username(username):
     return True
 
 
-def check_user_is_not_registred(username, email):
+def get_registered_user(username, email):
     """
-    Проверка, что пользователь не пытается зарегистрироваться,
-    с уже занятыми данными
+    Поиск уже зарегистрированного пользователя одним запросом.
+    Возвращает пару (пользователь, занято): пользователя с такими же
+    username и email (или None) и признак того, что username или email
+    заняты другим пользователем
     """
-    if User.objects.filter(
-        email=email,
-        username=username
-    ).exists():
-        return True
-
-    if User.objects.filter(
-        username=username
-    ).exists():
-        return False
-    if User.objects.filter(
-        email=email
-    ).exists():
-        return False
-    return True
+    users = User.objects.filter(Q(username=username) | Q(email=email))[:2]
+    for user in users:
+        if user.username == username and user.email == email:
+            return user, False
+    return None, bool(users)
@@ -2,7 +2,8 @@ from http import HTTPStatus
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage
+from django.db import IntegrityError, transaction
 from django.shortcuts import get_object_or_404
 from rest_framework import viewsets
 from rest_framework.decorators import action, api_view
@@ -10,10 +11,12 @@ from rest_framework.filters import SearchFilter
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
 
+from api.cache import invalidate
 from api.permissions import IsAdmin
 from api_yamdb.settings import HOST_EMAIL
+from users.authentication import RoleAccessToken
+from users.outbox import outbox
 from users.serializers import (SignUpSerializer, UserGetTokenSerializer,
                                UserSerializer)
 
@@ -37,6 +40,16 @@ class UserViewSet(viewsets.ModelViewSet):
     pagination_class = LimitOffsetPagination
     http_method_names = ('get', 'post', 'patch', 'delete')
 
+    def perform_update(self, serializer):
+        """Изменяет пользователя; имя автора входит в ответы с отзывами."""
+        super().perform_update(serializer)
+        invalidate('users')
+
+    def perform_destroy(self, instance):
+        """Удаляет пользователя вместе с его отзывами и комментариями."""
+        super().perform_destroy(instance)
+        invalidate('users')
+
     @action(
         methods=('GET', 'PATCH'),
         detail=False,
@@ -45,9 +58,10 @@ class UserViewSet(viewsets.ModelViewSet):
     )
     def edit_profile(self, request):
         """Действие для обработки эндпойнта /me"""
+        user = get_object_or_404(User, pk=request.user.pk)
         if request.method == 'GET':
             serializer = UserSerializer(
-                request.user,
+                user,
                 context={'request': request}
             )
             return Response(
@@ -55,22 +69,26 @@ class UserViewSet(viewsets.ModelViewSet):
                 status=HTTPStatus.OK
             )
         serializer = UserSerializer(
-            request.user,
+            user,
             context={'request': request},
             data=request.data,
             partial=True
         )
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        invalidate('users')
         return Response(
             data=serializer.data
         )
 
 
 def generate_confiramtion_code(signed_user, email):
-    """Функция генерации и отправки верификационных кодов"""
+    """
+    Функция генерации верификационных кодов,
+    письмо с кодом ставится в очередь на отправку
+    """
     token = default_token_generator.make_token(signed_user)
-    return send_mail(
+    outbox.put(EmailMessage(
         'Код авторизации для YAMDB',
         f'''
         {token}
@@ -78,8 +96,7 @@ def generate_confiramtion_code(signed_user, email):
         ''',
         HOST_EMAIL,
         [email],
-        fail_silently=False,
-    )
+    ))
 
 
 @api_view(['POST'])
@@ -92,10 +109,19 @@ def send_confirmation_code(request):
     serializer.is_valid(raise_exception=True)
     username = serializer.validated_data.get('username')
     email = serializer.validated_data.get('email')
-    signed_user, created = User.objects.get_or_create(
-        email=email,
-        username=username
-    )
+    signed_user = serializer.registered_user
+    if signed_user is None:
+        try:
+            with transaction.atomic():
+                signed_user = User.objects.create(
+                    email=email,
+                    username=username
+                )
+        except IntegrityError:
+            # Параллельный запрос успел зарегистрировать эти данные:
+            # повторная проверка вернёт его пользователя или ошибку
+            serializer.validate(serializer.validated_data)
+            signed_user = serializer.registered_user
     generate_confiramtion_code(
         signed_user=signed_user,
         email=email
@@ -115,7 +141,7 @@ def get_token(request):
     confirmation_code = serializer.validated_data.get('confirmation_code')
     user = get_object_or_404(User, username=username)
     if default_token_generator.check_token(user, confirmation_code):
-        access_token = AccessToken.for_user(user)
+        access_token = RoleAccessToken.for_user(user)
         return Response(
             {'token': str(access_token)},
             status=HTTPStatus.OK
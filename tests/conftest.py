@@ -1,6 +1,7 @@
 import os
 import sys
 
+import pytest
 from django.utils.version import get_version
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -33,3 +34,21 @@ assert get_version() < '4.0.0', 'Пожалуйста, используйте в
 pytest_plugins = [
     'tests.fixtures.fixture_user',
 ]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Кэш переживает тесты, а БД откатывается после каждого теста."""
+    from django.core.cache import cache
+    from users.authentication import states
+    cache.clear()
+    states.clear()
+    yield
+    cache.clear()
+    states.clear()
+
+
+@pytest.fixture(autouse=True)
+def eager_email_outbox(settings):
+    """Тесты проверяют отправленные письма сразу после ответа API."""
+    settings.EMAIL_OUTBOX_EAGER = True
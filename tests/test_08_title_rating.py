@@ -0,0 +1,87 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from reviews.models import Title
+from tests.utils import (create_reviews, create_single_review,
+                         create_titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def test_01_rating_follows_review_changes(self, admin_client, admin,
+                                              user, user_client):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        create_single_review(user_client, titles[0]['id'], 'text', 9)
+        assert admin_client.get(title_url).json()['rating'] == 7, (
+            'Проверьте, что после создания отзыва рейтинг произведения '
+            'пересчитывается.'
+        )
+
+        review_url = f'{title_url}reviews/{reviews[0]["id"]}/'
+        response = admin_client.patch(review_url, data={'score': 1})
+        assert response.status_code == HTTPStatus.OK
+        assert admin_client.get(title_url).json()['rating'] == 5, (
+            'Проверьте, что после изменения оценки в отзыве рейтинг '
+            'произведения пересчитывается.'
+        )
+
+        response = admin_client.delete(review_url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert admin_client.get(title_url).json()['rating'] == 9, (
+            'Проверьте, что после удаления отзыва рейтинг произведения '
+            'пересчитывается.'
+        )
+
+    def test_02_rebuild_ratings_command(self, admin_client, admin):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        Title.objects.update(rating_sum=0, rating_count=0)
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', '--check')
+
+        call_command('rebuild_ratings')
+        call_command('rebuild_ratings', '--check')
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (5, 1), (
+            'Проверьте, что команда `rebuild_ratings` пересчитывает '
+            'хранимый рейтинг по отзывам.'
+        )
+
+    def test_03_author_deletion(self, admin_client, user, user_client,
+                                client):
+        titles, _, _ = create_titles(admin_client)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        create_single_review(user_client, titles[0]['id'], 'text', 10)
+        data = client.get(title_url).json()
+        assert (data['rating'], data['reviews_count']) == (10, 1)
+
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        data = client.get(title_url).json()
+        assert (data['rating'], data['reviews_count']) == (None, 0), (
+            'Проверьте, что отзывы, удалённые вместе с автором, исключаются '
+            'из рейтинга произведения и сбрасывают кэш ответа.'
+        )
+        call_command('rebuild_ratings', '--check')
+
+    def test_04_orm_changes(self, admin_client, admin, user):
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.get(pk=titles[0]['id'])
+        review = title.reviews.create(author=admin, text='text', score=4)
+        title.reviews.create(author=user, text='text', score=8)
+        review.score = 2
+        review.save()
+        review.text = 'new'
+        review.save(update_fields=('text',))
+        call_command('rebuild_ratings', '--check')
+        title.refresh_from_db()
+        assert (title.rating, title.score_2, title.score_4) == (5, 1, 0), (
+            'Проверьте, что рейтинг следует за отзывами, изменёнными '
+            'не через API, например, в админке.'
+        )
+        review.delete()
+        call_command('rebuild_ratings', '--check')
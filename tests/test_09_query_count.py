@@ -0,0 +1,128 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.authentication import states
+
+
+def create_catalog(prefix, size, django_user_model):
+    """Создаёт `size` объектов каждого вида, связанных с первым отзывом."""
+    authors = [
+        django_user_model.objects.create_user(
+            username=f'{prefix}{idx}', email=f'{prefix}{idx}@yamdb.fake'
+        )
+        for idx in range(size)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {idx}', slug=f'{prefix}-genre-{idx}')
+        for idx in range(size)
+    ]
+    titles = []
+    for idx in range(size):
+        category = Category.objects.create(
+            name=f'Категория {idx}', slug=f'{prefix}-category-{idx}'
+        )
+        title = Title.objects.create(
+            name=f'Произведение {idx}', year=2000, category=category
+        )
+        title.genre.set(genres[:idx + 1])
+        titles.append(title)
+    reviews = [
+        Review.objects.create(
+            title=titles[0], author=author, text='text', score=5
+        )
+        for author in authors
+    ]
+    for author in authors:
+        Comment.objects.create(review=reviews[0], author=author, text='text')
+    return titles[0], reviews[0]
+
+
+def count_queries(client, url):
+    cache.clear()
+    states.clear()
+    reset_queries()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+        'статусом 200.'
+    )
+    return len(context.captured_queries)
+
+
+LIST_URLS = (
+    '/api/v1/users/',
+    '/api/v1/categories/',
+    '/api/v1/genres/',
+    '/api/v1/titles/',
+    '/api/v1/titles/{title_id}/reviews/',
+    '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryCount:
+
+    @pytest.mark.parametrize('url', LIST_URLS)
+    def test_01_list_query_count_does_not_grow(self, url, admin_client,
+                                               django_user_model):
+        title, review = create_catalog('small', 2, django_user_model)
+        small_url = url.format(title_id=title.pk, review_id=review.pk)
+        small = count_queries(admin_client, small_url)
+
+        title, review = create_catalog('large', 10, django_user_model)
+        large_url = url.format(title_id=title.pk, review_id=review.pk)
+        large = count_queries(admin_client, large_url)
+
+        assert small and small == large, (
+            f'Проверьте, что количество SQL-запросов при GET-запросе к '
+            f'`{url}` не зависит от количества объектов на странице: '
+            f'{small} запросов для небольшой выборки и {large} для большой.'
+        )
+
+    @pytest.mark.parametrize('method,url,data,table,expected', (
+        ('get', '/api/v1/titles/{title_id}/reviews/', None,
+         'reviews_title', 1),
+        ('get', '/api/v1/titles/{title_id}/reviews/{review_id}/', None,
+         'reviews_title', 1),
+        ('post', '/api/v1/titles/{title_id}/reviews/',
+         {'text': 'text', 'score': 5}, 'reviews_title', 1),
+        ('get', '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+         None, 'reviews_review', 1),
+        ('get', '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+         '{comment_id}/', None, 'reviews_review', 1),
+        ('post', '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+         {'text': 'text'}, 'reviews_review', 1),
+    ))
+    def test_02_nested_parent_fetched_once(self, method, url, data, table,
+                                           expected, admin_client,
+                                           django_user_model):
+        title, review = create_catalog('nested', 2, django_user_model)
+        url = url.format(
+            title_id=title.pk, review_id=review.pk,
+            comment_id=review.comments.first().pk
+        )
+        reset_queries()
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(admin_client, method)(url, data=data)
+        assert response.status_code < 300
+        selects = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and f'FROM "{table}"' in query['sql']
+        ]
+        assert len(selects) == expected, (
+            f'Проверьте, что при {method.upper()}-запросе к `{url}` '
+            f'родительский объект из таблицы `{table}` запрашивается '
+            f'{expected} раз, а не {len(selects)}.'
+        )
+        if table == 'reviews_review':
+            assert 'reviews_title' not in ''.join(
+                query['sql'] for query in context.captured_queries
+            ), (
+                'Проверьте, что отзыв и его принадлежность произведению '
+                'проверяются одним запросом.'
+            )
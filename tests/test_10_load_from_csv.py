@@ -0,0 +1,125 @@
+import shutil
+from csv import DictReader
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from reviews.management.commands.load_from_csv import (MODEL_TO_CSV,
+                                                       Checkpoint,
+                                                       dependency_levels)
+from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                            Title)
+from users.models import User
+
+
+def count_rows(path):
+    with open(path, encoding='utf8', newline='') as file:
+        return sum(1 for _ in DictReader(file))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10LoadFromCsv:
+
+    def test_01_load_in_batches(self, tmp_path):
+        data_dir = settings.BASE_DIR / 'static/data'
+        checkpoint = tmp_path / 'checkpoint.json'
+        call_command(
+            'load_from_csv', batch_size=7, workers=2, checkpoint=checkpoint
+        )
+        for model, filename in (
+            (Title, 'titles.csv'),
+            (GenreTitle, 'genre_title.csv'),
+            (Review, 'review.csv'),
+            (Comment, 'comments.csv'),
+        ):
+            assert model.objects.count() == count_rows(data_dir / filename), (
+                f'Проверьте, что команда `load_from_csv` загружает все '
+                f'строки файла `{filename}`.'
+            )
+        assert not checkpoint.exists(), (
+            'Проверьте, что после успешного импорта файл контрольной '
+            'точки удаляется.'
+        )
+        title = Title.objects.get(pk=1)
+        assert title.rating_count == title.reviews.count(), (
+            'Проверьте, что после импорта пересчитывается рейтинг '
+            'произведений.'
+        )
+
+    def test_02_resume_after_failure(self, tmp_path):
+        data_dir = tmp_path / 'data'
+        shutil.copytree(settings.BASE_DIR / 'static/data', data_dir)
+        comments = data_dir / 'comments.csv'
+        fixed = (
+            comments.read_text(encoding='utf8').rstrip('\n')
+            + '\n999,1,text,100,2020-01-01T00:00:00Z\n'
+        )
+        comments.write_text(fixed + fixed.splitlines()[-1], encoding='utf8')
+        checkpoint = tmp_path / 'checkpoint.json'
+        with pytest.raises(Exception):
+            call_command(
+                'load_from_csv', data_dir=data_dir, batch_size=1,
+                workers=1, checkpoint=checkpoint
+            )
+        assert checkpoint.exists()
+
+        comments.write_text(fixed, encoding='utf8')
+        call_command(
+            'load_from_csv', data_dir=data_dir, batch_size=1,
+            workers=1, checkpoint=checkpoint, resume=True
+        )
+        assert Review.objects.count() == count_rows(data_dir / 'review.csv')
+        assert Comment.objects.count() == count_rows(comments), (
+            'Проверьте, что продолжение импорта после сбоя не дублирует '
+            'уже загруженные строки.'
+        )
+
+    def test_03_dependency_levels(self):
+        levels = [set(level) for level in dependency_levels(MODEL_TO_CSV)]
+        assert levels == [
+            {User, Genre, Category}, {Title}, {GenreTitle, Review}, {Comment}
+        ], (
+            'Проверьте, что модели группируются по уровням зависимостей '
+            'внешних ключей.'
+        )
+
+    def test_04_invalid_row_reported(self, tmp_path):
+        data_dir = tmp_path / 'data'
+        shutil.copytree(settings.BASE_DIR / 'static/data', data_dir)
+        with open(data_dir / 'titles.csv', 'a', encoding='utf8') as file:
+            file.write('\n999,Будущее,3000,1\n')
+        with pytest.raises(CommandError, match='reviews.Title'):
+            call_command(
+                'load_from_csv', data_dir=data_dir, workers=2,
+                checkpoint=tmp_path / 'checkpoint.json'
+            )
+
+    def test_05_resume_after_uncheckpointed_batch(self, tmp_path,
+                                                  monkeypatch):
+        data_dir = settings.BASE_DIR / 'static/data'
+        checkpoint = tmp_path / 'checkpoint.json'
+        save = Checkpoint.save
+
+        def crash(self, model, rows):
+            if model is Review and rows > 3:
+                raise RuntimeError('crash after commit')
+            save(self, model, rows)
+
+        monkeypatch.setattr(Checkpoint, 'save', crash)
+        with pytest.raises(RuntimeError):
+            call_command(
+                'load_from_csv', batch_size=2, workers=1,
+                checkpoint=checkpoint
+            )
+        monkeypatch.setattr(Checkpoint, 'save', save)
+        assert Review.objects.count() == 4
+        call_command(
+            'load_from_csv', batch_size=2, workers=1,
+            checkpoint=checkpoint, resume=True
+        )
+        assert Review.objects.count() == count_rows(data_dir / 'review.csv'), (
+            'Проверьте, что импорт продолжается, если пачка была '
+            'загружена, но не записана в контрольную точку.'
+        )
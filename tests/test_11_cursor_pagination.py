@@ -0,0 +1,75 @@
+import pytest
+
+from api.pagination import PublishedCursorPagination
+from reviews.models import Comment, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11CursorPagination:
+
+    def test_01_comments_cursor_pages(self, client, user, monkeypatch):
+        monkeypatch.setattr(PublishedCursorPagination, 'page_size', 2)
+        title = Title.objects.create(name='Произведение', year=2000)
+        review = Review.objects.create(
+            title=title, author=user, text='text', score=5
+        )
+        expected = [
+            Comment.objects.create(review=review, author=user, text=str(i)).pk
+            for i in range(5)
+        ][::-1]
+
+        url = (
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+            '?cursor='
+        )
+        received = []
+        while url:
+            data = client.get(url).json()
+            assert 'count' not in data, (
+                'Проверьте, что при передаче параметра `cursor` используется '
+                'курсорная пагинация.'
+            )
+            assert len(data['results']) <= 2
+            received.extend(comment['id'] for comment in data['results'])
+            url = data['next']
+        assert received == expected, (
+            'Проверьте, что курсорная пагинация комментариев возвращает все '
+            'комментарии от новых к старым без пропусков и повторов.'
+        )
+
+    def test_02_page_number_by_default(self, client, user):
+        title = Title.objects.create(name='Произведение', year=2000)
+        Review.objects.create(title=title, author=user, text='text', score=5)
+        data = client.get(f'/api/v1/titles/{title.pk}/reviews/').json()
+        assert data['count'] == 1, (
+            'Проверьте, что без параметра `cursor` отзывы выдаются с '
+            'постраничной пагинацией.'
+        )
+
+    @pytest.mark.parametrize('rows', (True, False))
+    @pytest.mark.parametrize('param', ('fields=text', 'omit=pub_date'))
+    def test_03_cursor_with_sparse_fields(self, client, django_user_model,
+                                          monkeypatch, settings, rows, param):
+        settings.API_ROW_SERIALIZATION = rows
+        monkeypatch.setattr(PublishedCursorPagination, 'page_size', 2)
+        title = Title.objects.create(name='Произведение', year=2000)
+        for idx in range(5):
+            Review.objects.create(
+                title=title, text=str(idx), score=5,
+                author=django_user_model.objects.create(
+                    username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+                ),
+            )
+        url = f'/api/v1/titles/{title.pk}/reviews/?cursor=&{param}'
+        received = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200, (
+                'Проверьте, что курсорная пагинация работает, даже если '
+                '`fields` или `omit` убирают из ответа `pub_date`.'
+            )
+            data = response.json()
+            assert all('pub_date' not in item for item in data['results'])
+            received.extend(item['text'] for item in data['results'])
+            url = data['next']
+        assert received == ['4', '3', '2', '1', '0']
@@ -0,0 +1,126 @@
+import subprocess
+import sys
+from http import HTTPStatus
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+
+from api.cache import get_stats
+from reviews.models import Title
+from tests.utils import create_categories, create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ResponseCache:
+
+    def test_01_list_cached_until_admin_write(self, client, admin_client):
+        create_categories(admin_client)
+        url = '/api/v1/categories/'
+        assert client.get(url)['X-Cache'] == 'MISS'
+        response = client.get(url)
+        assert response['X-Cache'] == 'HIT', (
+            f'Проверьте, что повторный GET-запрос к `{url}` обслуживается '
+            'из кэша.'
+        )
+        assert response.json()['count'] == 2
+        assert get_stats() == {'hits': 1, 'misses': 1}
+
+        response = admin_client.delete(f'{url}films/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS', (
+            f'Проверьте, что удаление объекта сбрасывает кэш `{url}`.'
+        )
+        assert response.json()['count'] == 1
+
+    def test_02_title_cache_follows_rating(self, client, admin_client,
+                                           user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        other_url = f'/api/v1/titles/{titles[1]["id"]}/'
+        assert client.get(url).json()['rating'] is None
+        client.get(other_url)
+
+        create_single_review(user_client, titles[0]['id'], 'text', 7)
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['rating'] == 7, (
+            'Проверьте, что новый отзыв сбрасывает кэш произведения.'
+        )
+        assert client.get(other_url)['X-Cache'] == 'HIT', (
+            'Проверьте, что отзыв сбрасывает кэш только своего произведения.'
+        )
+        ratings = {
+            title['id']: title['rating']
+            for title in client.get('/api/v1/titles/').json()['results']
+        }
+        assert ratings[titles[0]['id']] == 7, (
+            'Проверьте, что новый отзыв сбрасывает кэш списка произведений.'
+        )
+
+    def test_03_write_in_other_process(self, client, admin_client):
+        create_categories(admin_client)
+        url = '/api/v1/categories/'
+        client.get(url)
+        assert client.get(url)['X-Cache'] == 'HIT'
+        subprocess.run(
+            [
+                sys.executable, 'manage.py', 'shell', '-c',
+                'from api.cache import bump_versions; '
+                'bump_versions("categories")',
+            ],
+            cwd=Path(__file__).resolve().parent.parent / 'api_yamdb',
+            check=True,
+        )
+        assert client.get(url)['X-Cache'] == 'MISS', (
+            'Проверьте, что запись в другом процессе сбрасывает кэш: версии '
+            'должны храниться в общем для процессов кэше.'
+        )
+
+    def test_04_padded_title_id(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]:04d}/'
+        assert client.get(url).json()['rating'] is None
+        assert client.get(url)['X-Cache'] == 'HIT'
+        create_single_review(user_client, titles[0]['id'], 'text', 7)
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что id с ведущими нулями попадает в пространство '
+            'имён кэша, которое сбрасывают записи.'
+        )
+        assert response.json()['rating'] == 7
+
+    def test_05_host_and_scheme(self, client):
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {idx}', year=2000) for idx in range(101)
+        )
+        url = '/api/v1/titles/'
+        assert client.get(url).json()['next'].startswith('http://testserver/')
+        for extra, prefix in (
+            ({'HTTP_HOST': 'api.example.com'}, 'http://api.example.com/'),
+            ({'secure': True}, 'https://testserver/'),
+        ):
+            response = client.get(url, **extra)
+            assert response['X-Cache'] == 'MISS'
+            assert response.json()['next'].startswith(prefix), (
+                'Проверьте, что ответы с абсолютными ссылками кэшируются '
+                'отдельно для каждых схемы и хоста.'
+            )
+
+    def test_06_stats_command(self, client, admin_client, settings):
+        create_categories(admin_client)
+        url = '/api/v1/categories/'
+        client.get(url)
+        client.get(url)
+        client.get(url)
+        out = StringIO()
+        call_command('cache_stats', reset=True, stdout=out)
+        assert 'hits: 2, misses: 1' in out.getvalue(), (
+            'Проверьте, что команда `cache_stats` выводит счётчики кэша.'
+        )
+        assert get_stats() == {'hits': 0, 'misses': 0}
+        settings.API_CACHE_STATS = False
+        client.get(url)
+        assert get_stats() == {'hits': 0, 'misses': 0}
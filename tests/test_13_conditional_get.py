@@ -0,0 +1,147 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review, Title
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ConditionalGet:
+
+    def check_not_modified(self, client, url):
+        etag = client.get(url)['ETag']
+        reset_queries()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным заголовком '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+        assert not context.captured_queries, (
+            f'Проверьте, что ответ 304 на GET-запрос к `{url}` формируется '
+            'без запросов к БД.'
+        )
+        return etag
+
+    def test_01_reviews_and_comments(self, client, admin_client, admin,
+                                     user, user_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        reviews_url = f'{title_url}reviews/'
+        review_url = f'{reviews_url}{reviews[0]["id"]}/'
+        comments_url = f'{review_url}comments/'
+        for url in (title_url, reviews_url, review_url, comments_url):
+            self.check_not_modified(client, url)
+
+        etag = self.check_not_modified(client, comments_url)
+        user_client.post(comments_url, data={'text': 'new comment'})
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый комментарий меняет ETag списка '
+            'комментариев.'
+        )
+
+        etag = self.check_not_modified(client, reviews_url)
+        admin_client.patch(review_url, data={'text': 'edited'})
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение отзыва меняет ETag списка отзывов.'
+        )
+        assert response.json()['results']
+
+    def test_02_username_change_changes_etag(self, client, admin_client,
+                                             user_client, user):
+        _, _, titles = create_comments(admin_client, {user: user_client})
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        etag = self.check_not_modified(client, url)
+        user_client.patch('/api/v1/users/me/', data={'username': 'renamed'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'][0]['author'] == 'renamed'
+
+    def test_03_padded_ids(self, client, admin_client, admin, user,
+                           user_client):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]:04d}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]:04d}/comments/'
+        etags = {
+            url: self.check_not_modified(client, url)
+            for url in (reviews_url, comments_url)
+        }
+        user_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            f'{reviews[0]["id"]}/comments/', data={'text': 'new comment'}
+        )
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/',
+            data={'text': 'edited'}
+        )
+        for url, etag in etags.items():
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что ETag `{url}` с ведущими нулями в id '
+                'меняется после записи.'
+            )
+
+    def check_modified(self, client, url, etag, change):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что {change} меняет ETag `{url}`.'
+        )
+
+    def test_04_writes_outside_api(self, client, admin_client, admin, user,
+                                   user_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        comments_url = f'{title_url}reviews/{reviews[0]["id"]}/comments/'
+
+        etag = self.check_not_modified(client, comments_url)
+        Comment.objects.filter(pk=comments[0]['id']).first().delete()
+        self.check_modified(
+            client, comments_url, etag, 'удаление комментария через ORM'
+        )
+
+        etag = self.check_not_modified(client, title_url)
+        title = Title.objects.get(pk=titles[0]['id'])
+        title.description = 'Изменено в админке'
+        title.save()
+        self.check_modified(
+            client, title_url, etag, 'изменение произведения через ORM'
+        )
+
+        etag = self.check_not_modified(client, title_url)
+        Title.objects.update(rating_sum=0, rating_count=0)
+        call_command('rebuild_ratings')
+        self.check_modified(client, title_url, etag, '`rebuild_ratings`')
+
+        reviews_url = f'{title_url}reviews/'
+        etag = self.check_not_modified(client, reviews_url)
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        self.check_modified(
+            client, reviews_url, etag, 'удаление автора отзывов'
+        )
+        assert not Review.objects.filter(author=user).exists()
+
+    def test_05_load_from_csv(self, client, tmp_path):
+        url = '/api/v1/titles/'
+        etag = self.check_not_modified(client, url)
+        call_command(
+            'load_from_csv', workers=1, checkpoint=tmp_path / 'checkpoint'
+        )
+        self.check_modified(client, url, etag, '`load_from_csv`')
+        response = client.get('/api/v1/autocomplete/', {'q': 'Г'})
+        assert response.json(), (
+            'Проверьте, что после `load_from_csv` индекс автодополнения '
+            'перестраивается.'
+        )
@@ -0,0 +1,68 @@
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.mail.backends.locmem import EmailBackend
+
+from users.outbox import Outbox, outbox
+
+
+class FlakyBackend(EmailBackend):
+    """Почтовый бэкенд, соединение которого обрывается на третьем письме.
+    Письма, принятые до обрыва, уже доставлены.
+    """
+
+    connections = 0
+    calls = []
+
+    def open(self):
+        FlakyBackend.connections += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        FlakyBackend.calls.append(len(messages))
+        if len(FlakyBackend.calls) == 3:
+            raise ConnectionError('SMTP server is unavailable')
+        return super().send_messages(messages)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14EmailOutbox:
+
+    def test_01_signup_queues_email(self, client, settings):
+        settings.EMAIL_OUTBOX_EAGER = False
+        outbox_before_count = len(mail.outbox)
+        response = client.post('/api/v1/auth/signup/', data={
+            'email': 'queued@yamdb.fake', 'username': 'queued'
+        })
+        assert response.status_code == HTTPStatus.OK
+        assert outbox.flush(timeout=5)
+        assert len(mail.outbox) == outbox_before_count + 1, (
+            'Проверьте, что письмо с кодом подтверждения, поставленное в '
+            'очередь, отправляется фоновым обработчиком.'
+        )
+        assert mail.outbox[-1].to == ['queued@yamdb.fake']
+
+    def test_02_unsent_retried_over_new_connection(self, settings):
+        settings.EMAIL_OUTBOX_EAGER = False
+        settings.EMAIL_OUTBOX_RETRY_DELAY = 0
+        settings.EMAIL_BACKEND = 'tests.test_14_email_outbox.FlakyBackend'
+        FlakyBackend.calls.clear()
+        FlakyBackend.connections = 0
+        outbox_before_count = len(mail.outbox)
+        box = Outbox()
+        for idx in range(5):
+            box.queue.put(EmailMessage('subject', 'body', to=[f'{idx}@a.b']))
+        box.start()
+        assert box.flush(timeout=5)
+        assert FlakyBackend.connections == 2, (
+            'Проверьте, что пачка писем отправляется через одно соединение '
+            'и после ошибки соединение открывается заново.'
+        )
+        assert [
+            message.to[0] for message in mail.outbox[outbox_before_count:]
+        ] == [f'{idx}@a.b' for idx in range(5)], (
+            'Проверьте, что после ошибки повторно отправляются только '
+            'неотправленные письма, без дублей.'
+        )
@@ -0,0 +1,93 @@
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+
+from users import serializers
+
+URL = '/api/v1/auth/signup/'
+
+
+def signup(client, username, email):
+    reset_queries()
+    with CaptureQueriesContext(connection) as context:
+        response = client.post(URL, data={
+            'username': username, 'email': email
+        })
+    queries = [
+        query['sql'] for query in context.captured_queries
+        if not query['sql'].startswith(('BEGIN', 'SAVEPOINT', 'RELEASE'))
+    ]
+    return response, queries
+
+
+def register_concurrently(monkeypatch, django_user_model, username, email):
+    """Имитирует параллельную регистрацию: другой запрос создаёт
+    пользователя между проверкой данных и созданием записи.
+    """
+    original = serializers.get_registered_user
+
+    def racing_lookup(username, email):
+        result = original(username=username, email=email)
+        monkeypatch.setattr(serializers, 'get_registered_user', original)
+        django_user_model.objects.create(**racer)
+        return result
+
+    racer = {'username': username, 'email': email}
+    monkeypatch.setattr(serializers, 'get_registered_user', racing_lookup)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15SignUpRace:
+
+    def test_01_single_lookup_query(self, client, user):
+        response, queries = signup(client, 'newuser', 'new@yamdb.fake')
+        assert response.status_code == HTTPStatus.OK
+        assert len(queries) == 2, (
+            'Проверьте, что регистрация нового пользователя выполняет один '
+            'запрос проверки и один запрос создания.'
+        )
+
+        response, queries = signup(client, user.username, user.email)
+        assert response.status_code == HTTPStatus.OK
+        assert len(queries) == 1, (
+            'Проверьте, что повторная регистрация выполняет один запрос.'
+        )
+
+        for username, email in (
+            (user.username, 'other@yamdb.fake'),
+            ('other', user.email),
+        ):
+            response, queries = signup(client, username, email)
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+            assert len(queries) == 1
+
+    def test_02_concurrent_same_signup(self, client, monkeypatch,
+                                       django_user_model):
+        register_concurrently(
+            monkeypatch, django_user_model, 'racer', 'racer@yamdb.fake'
+        )
+        outbox_before_count = len(mail.outbox)
+        response, _ = signup(client, 'racer', 'racer@yamdb.fake')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что одновременная регистрация с одинаковыми данными '
+            'не приводит к ошибке.'
+        )
+        assert django_user_model.objects.filter(username='racer').count() == 1
+        assert len(mail.outbox) == outbox_before_count + 1
+
+    def test_03_concurrent_conflicting_signup(self, client, monkeypatch,
+                                              django_user_model):
+        register_concurrently(
+            monkeypatch, django_user_model, 'racer', 'first@yamdb.fake'
+        )
+        response, _ = signup(client, 'racer', 'second@yamdb.fake')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что при одновременной регистрации с занятым '
+            'username возвращается ответ со статусом 400.'
+        )
+        assert not django_user_model.objects.filter(
+            email='second@yamdb.fake'
+        ).exists()
@@ -0,0 +1,65 @@
+import pytest
+
+from reviews.models import Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16TitleSearch:
+
+    def search(self, client, query):
+        response = client.get('/api/v1/titles/', {'search': query})
+        assert response.status_code == 200
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_ranked_search(self, client):
+        Title.objects.create(
+            name='Крепкий орешек', year=1988, description='Про терминатор'
+        )
+        Title.objects.create(
+            name='Терминатор', year=1984, description='Робот из будущего'
+        )
+        Title.objects.create(name='Чужой', year=1979, description='Космос')
+
+        assert self.search(client, 'терминатор') == [
+            'Терминатор', 'Крепкий орешек'
+        ], (
+            'Проверьте, что параметр `search` ищет по названию и описанию '
+            'и совпадения в названии идут первыми.'
+        )
+        assert self.search(client, 'робот будущего') == ['Терминатор']
+        assert self.search(client, '"*') == []
+
+    def test_02_index_follows_writes(self, client, admin_client):
+        title = Title.objects.create(name='Чужой', year=1979)
+        assert self.search(client, 'чужой') == ['Чужой']
+
+        response = admin_client.patch(
+            f'/api/v1/titles/{title.pk}/', data={'name': 'Чужие'}
+        )
+        assert response.status_code == 200
+        assert self.search(client, 'чужой') == []
+        assert self.search(client, 'чужие') == ['Чужие']
+
+        admin_client.delete(f'/api/v1/titles/{title.pk}/')
+        assert self.search(client, 'чужие') == [], (
+            'Проверьте, что поисковый индекс обновляется при изменении и '
+            'удалении произведений.'
+        )
+
+    def test_03_combines_with_filters_and_fields(self, client, settings):
+        Title.objects.create(name='Терминатор', year=1984)
+        Title.objects.create(name='Терминатор 2', year=1991)
+        Title.objects.create(name='Чужой', year=1979)
+        for rows in (True, False):
+            settings.API_ROW_SERIALIZATION = rows
+            response = client.get('/api/v1/titles/', {
+                'search': 'терминатор', 'year__gte': 1990,
+                'fields': 'name,year',
+            })
+            assert response.status_code == 200
+            assert response.json()['results'] == [
+                {'name': 'Терминатор 2', 'year': 1991}
+            ], (
+                'Проверьте, что поиск сочетается с фильтрами и выбором '
+                'полей ответа.'
+            )
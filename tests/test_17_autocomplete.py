@@ -0,0 +1,107 @@
+from http import HTTPStatus
+
+import pytest
+
+from api.autocomplete import PrefixIndex
+from tests.utils import create_single_review, create_titles
+
+URL = '/api/v1/autocomplete/'
+
+
+def suggest(client, **params):
+    response = client.get(URL, params)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{URL}` возвращает ответ со '
+        'статусом 200.'
+    )
+    return [item['name'] for item in response.json()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Autocomplete:
+
+    def test_01_prefix_search(self, client, admin_client):
+        create_titles(admin_client)
+        assert suggest(client, q='К') == [
+            'Книги', 'Комедия', 'Крепкий орешек'
+        ], (
+            'Проверьте, что автодополнение ищет по началу названия среди '
+            'произведений, жанров и категорий.'
+        )
+        assert suggest(client, q='оре') == ['Крепкий орешек'], (
+            'Проверьте, что автодополнение ищет по началу любого слова '
+            'в названии.'
+        )
+        assert suggest(client, q='dra') == ['Драма']
+        assert suggest(client, q='к', type='genres') == ['Комедия']
+        assert suggest(client, q='к', limit=1) == ['Книги']
+        assert client.get(URL, {'q': 'к', 'type': 'users'}).status_code == (
+            HTTPStatus.BAD_REQUEST
+        )
+
+    def test_02_incremental_refresh(self, client, admin_client,
+                                    monkeypatch):
+        create_titles(admin_client)
+        assert suggest(client, q='крим') == []
+
+        rebuilds = []
+        original = PrefixIndex.rebuild
+
+        def counting_rebuild(index, version):
+            rebuilds.append(index.kind)
+            original(index, version)
+
+        monkeypatch.setattr(PrefixIndex, 'rebuild', counting_rebuild)
+        admin_client.post(
+            '/api/v1/genres/', data={'name': 'Криминал', 'slug': 'crime'}
+        )
+        assert suggest(client, q='крим') == ['Криминал'], (
+            'Проверьте, что новый жанр сразу появляется в автодополнении.'
+        )
+        admin_client.delete('/api/v1/genres/crime/')
+        assert suggest(client, q='крим') == []
+        assert rebuilds == [], (
+            'Проверьте, что запись через API обновляет индекс '
+            'автодополнения без полного перестроения.'
+        )
+
+    def test_03_without_cache(self, client, admin_client, settings):
+        create_titles(admin_client)
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        }}
+        assert suggest(client, q='оре') == ['Крепкий орешек'], (
+            'Проверьте, что без кэша индекс автодополнения строится при '
+            'каждом запросе.'
+        )
+        admin_client.post(
+            '/api/v1/genres/', data={'name': 'Криминал', 'slug': 'crime'}
+        )
+        assert suggest(client, q='крим') == ['Криминал']
+
+    def test_04_title_writes_without_rebuild(self, client, admin_client,
+                                             user_client, monkeypatch):
+        titles, _, _ = create_titles(admin_client)
+        assert suggest(client, q='терм') == ['Терминатор']
+        rebuilds = []
+        original = PrefixIndex.rebuild
+
+        def counting_rebuild(index, version):
+            rebuilds.append(index.kind)
+            original(index, version)
+
+        monkeypatch.setattr(PrefixIndex, 'rebuild', counting_rebuild)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        create_single_review(user_client, titles[0]['id'], 'text', 7)
+        admin_client.patch(title_url, data={'description': 'Новое'})
+        assert suggest(client, q='терм') == ['Терминатор']
+        admin_client.patch(title_url, data={'name': 'Терминатор 2'})
+        admin_client.post('/api/v1/titles/bulk/', data=[{
+            'name': 'Термит', 'year': 2000, 'category': 'films',
+            'genre': ['drama'],
+        }], format='json')
+        assert suggest(client, q='терм') == ['Терминатор 2', 'Термит']
+        assert rebuilds == [], (
+            'Проверьте, что отзывы и изменения произведений не приводят '
+            'к полному перестроению индекса автодополнения.'
+        )
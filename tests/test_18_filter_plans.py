@@ -0,0 +1,50 @@
+import re
+from itertools import combinations
+
+import pytest
+from django.db import connection
+
+from api.filters import TitleFilter
+from reviews.models import Category, Genre, Title
+
+FILTERS = {
+    'category': 'films',
+    'genre': 'drama',
+    'name': 'Терминатор',
+    'year': 1984,
+}
+FULL_SCAN = re.compile(
+    r'\bSCAN (reviews_title|reviews_genretitle|reviews_genre|'
+    r'reviews_category)\b'
+)
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='План запроса разбирается для SQLite'
+)
+@pytest.mark.django_db(transaction=True)
+class Test18FilterPlans:
+
+    @pytest.mark.parametrize('names', [
+        names
+        for size in range(1, len(FILTERS) + 1)
+        for names in combinations(FILTERS, size)
+    ])
+    def test_01_filters_use_indexes(self, names):
+        category = Category.objects.create(name='Фильм', slug='films')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        title = Title.objects.create(
+            name='Терминатор', year=1984, category=category
+        )
+        title.genre.set([genre])
+
+        queryset = TitleFilter(
+            {name: FILTERS[name] for name in names},
+            queryset=Title.objects.select_related('category').order_by('pk'),
+        ).qs
+        assert list(queryset) == [title]
+        plan = queryset.explain()
+        assert not FULL_SCAN.search(plan), (
+            f'Проверьте, что фильтрация произведений по {", ".join(names)} '
+            f'использует индексы, а не полный просмотр таблицы:\n{plan}'
+        )
@@ -0,0 +1,88 @@
+import pytest
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+
+from api.filters import TitleFilter
+from reviews.models import Category, Genre, Title
+from tests.utils import create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19TitleRangeFilters:
+
+    @pytest.fixture
+    def catalog(self):
+        films = Category.objects.create(name='Фильм', slug='films')
+        books = Category.objects.create(name='Книга', slug='books')
+        music = Category.objects.create(name='Музыка', slug='music')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        rock = Genre.objects.create(name='Рок', slug='rock')
+        titles = {}
+        for name, year, category, genres in (
+            ('Чужой', 1979, films, [drama]),
+            ('Терминатор', 1984, films, [drama, comedy]),
+            ('Мастер и Маргарита', 1967, books, [comedy]),
+            ('Abbey Road', 1969, music, [rock]),
+        ):
+            titles[name] = Title.objects.create(
+                name=name, year=year, category=category
+            )
+            titles[name].genre.set(genres)
+        return titles
+
+    def names(self, client, params):
+        response = client.get('/api/v1/titles/', params)
+        assert response.status_code == 200, response.json()
+        return sorted(title['name'] for title in response.json()['results'])
+
+    def test_01_year_range(self, client, catalog):
+        assert self.names(client, {'year__gte': 1969, 'year__lte': 1980}) == [
+            'Abbey Road', 'Чужой'
+        ], 'Проверьте фильтры `year__gte` и `year__lte`.'
+
+    def test_02_multi_value(self, client, catalog):
+        assert self.names(client, {'genre__in': 'comedy,rock'}) == [
+            'Abbey Road', 'Мастер и Маргарита', 'Терминатор'
+        ], (
+            'Проверьте, что фильтр `genre__in` принимает несколько слагов '
+            'через запятую и не дублирует произведения.'
+        )
+        assert self.names(client, {'category__in': 'books,music'}) == [
+            'Abbey Road', 'Мастер и Маргарита'
+        ], 'Проверьте фильтр `category__in`.'
+        assert self.names(
+            client, {'category__in': 'films', 'genre__in': 'comedy'}
+        ) == ['Терминатор']
+
+    def test_03_rating_threshold(self, admin_client, user_client, catalog):
+        for client, score in ((admin_client, 10), (user_client, 7)):
+            create_single_review(
+                client, catalog['Чужой'].pk, 'Отзыв', score
+            )
+        create_single_review(
+            admin_client, catalog['Терминатор'].pk, 'Отзыв', 8
+        )
+        assert Title.objects.get(pk=catalog['Чужой'].pk).rating == 8.5
+        assert self.names(admin_client, {'rating__gte': 8.5}) == ['Чужой']
+        assert self.names(admin_client, {'rating__gte': 8}) == [
+            'Терминатор', 'Чужой'
+        ], (
+            'Проверьте, что фильтр `rating__gte` отбирает произведения по '
+            'средней оценке, а произведения без отзывов не попадают в выдачу.'
+        )
+
+    def test_04_single_query(self, catalog):
+        queryset = TitleFilter({
+            'year__gte': 1960, 'year__lte': 1990,
+            'genre__in': 'drama,comedy', 'category__in': 'films,books',
+            'rating__gte': 0,
+        }, queryset=Title.objects.all()).qs
+        reset_queries()
+        with CaptureQueriesContext(connection) as context:
+            list(queryset)
+        assert len(context.captured_queries) == 1, (
+            'Проверьте, что все фильтры произведений выполняются одним '
+            'запросом.'
+        )
+        assert 'HAVING' not in context.captured_queries[0]['sql']
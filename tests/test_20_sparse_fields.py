@@ -0,0 +1,92 @@
+import pytest
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+def get_with_queries(client, url, params):
+    reset_queries()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, params)
+    return response, [query['sql'] for query in context.captured_queries]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20SparseFields:
+
+    @pytest.fixture
+    def review(self, user):
+        category = Category.objects.create(name='Фильм', slug='films')
+        title = Title.objects.create(
+            name='Чужой', year=1979, category=category,
+            description='Длинное описание',
+        )
+        title.genre.set([Genre.objects.create(name='Драма', slug='drama')])
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=8
+        )
+        Comment.objects.create(review=review, author=user, text='Комментарий')
+        return review
+
+    def test_01_title_fields(self, client, review):
+        response, queries = get_with_queries(
+            client, '/api/v1/titles/', {'fields': 'id,name'}
+        )
+        assert response.status_code == 200
+        assert response.json()['results'] == [
+            {'id': review.title_id, 'name': 'Чужой'}
+        ], (
+            'Проверьте, что параметр `fields` оставляет в ответе только '
+            'перечисленные поля.'
+        )
+        sql = '\n'.join(queries)
+        assert 'description' not in sql and 'reviews_genre' not in sql, (
+            'Проверьте, что невыбранные поля и связи не загружаются из БД.'
+        )
+        assert 'reviews_category' not in sql
+
+    def test_02_title_omit(self, client, review):
+        response, queries = get_with_queries(
+            client, f'/api/v1/titles/{review.title_id}/',
+            {'omit': 'description,genre'}
+        )
+        assert response.status_code == 200
+        assert set(response.json()) == {
+            'id', 'name', 'year', 'category', 'rating', 'reviews_count',
+            'scores',
+        }, 'Проверьте, что параметр `omit` убирает поля из ответа.'
+        assert response.json()['category'] == {
+            'name': 'Фильм', 'slug': 'films'
+        }
+        assert not any('description' in sql for sql in queries)
+        assert not any('reviews_genre' in sql for sql in queries)
+
+    @pytest.mark.parametrize('suffix, params, expected', (
+        ('reviews/', {'fields': 'id,score', 'cursor': ''}, {'id', 'score'}),
+        ('reviews/', {'omit': 'text'}, {'id', 'author', 'score', 'pub_date'}),
+        ('reviews/{review_id}/comments/', {'fields': 'text'}, {'text'}),
+    ))
+    def test_03_nested_lists(self, client, review, suffix, params, expected):
+        url = f'/api/v1/titles/{review.title_id}/' + suffix.format(
+            review_id=review.pk
+        )
+        response, queries = get_with_queries(client, url, params)
+        assert response.status_code == 200
+        assert set(response.json()['results'][0]) == expected, (
+            'Проверьте, что параметры `fields` и `omit` работают для '
+            'отзывов и комментариев.'
+        )
+        if 'author' not in expected:
+            assert not any('users_user' in sql for sql in queries), (
+                'Проверьте, что автор не загружается, если поле `author` не '
+                'выбрано.'
+            )
+
+    def test_04_unknown_field(self, client, review):
+        response = client.get('/api/v1/titles/', {'fields': 'name,secret'})
+        assert response.status_code == 400, (
+            'Проверьте, что запрос неизвестных полей возвращает ответ со '
+            'статусом 400.'
+        )
+        assert 'fields' in response.json()
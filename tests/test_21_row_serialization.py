@@ -0,0 +1,66 @@
+import pytest
+from django.core.cache import cache
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21RowSerialization:
+
+    @pytest.fixture
+    def catalog(self, django_user_model):
+        authors = [
+            django_user_model.objects.create_user(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            for idx in range(3)
+        ]
+        category = Category.objects.create(name='Фильм', slug='films')
+        genres = [
+            Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+            for idx in range(4)
+        ]
+        titles = []
+        for idx in range(6):
+            title = Title.objects.create(
+                name=f'Произведение {idx}', year=1990 + idx,
+                category=category if idx % 2 else None,
+                description=f'Описание {idx}' if idx % 3 else None,
+            )
+            title.genre.set(genres[idx % 3:])
+            titles.append(title)
+        for idx, author in enumerate(authors):
+            review = Review.objects.create(
+                title=titles[0], author=author, text=f'Отзыв {idx}',
+                score=idx + 7,
+            )
+            Comment.objects.create(
+                review=review, author=authors[-idx], text=f'Комментарий {idx}'
+            )
+        Title.objects.rebuild_rating()
+        return titles[0], review
+
+    @pytest.mark.parametrize('url', (
+        '/api/v1/titles/',
+        '/api/v1/titles/?fields=id,genre,rating',
+        '/api/v1/titles/?omit=category&year__gte=1992',
+        '/api/v1/titles/?search=описание',
+        '/api/v1/titles/{title_id}/reviews/',
+        '/api/v1/titles/{title_id}/reviews/?cursor=',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/?omit=text',
+    ))
+    def test_01_identical_output(self, client, settings, catalog, url):
+        title, review = catalog
+        url = url.format(title_id=title.pk, review_id=review.pk)
+        settings.API_ROW_SERIALIZATION = False
+        expected = client.get(url)
+        settings.API_ROW_SERIALIZATION = True
+        cache.clear()
+        response = client.get(url)
+        assert response.status_code == expected.status_code == 200
+        assert response.content == expected.content, (
+            f'Проверьте, что ответ на GET-запрос к `{url}`, построенный по '
+            'строкам values(), побайтно совпадает с ответом сериализатора '
+            'модели.'
+        )
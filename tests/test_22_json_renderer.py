@@ -0,0 +1,101 @@
+import datetime
+import decimal
+import io
+import uuid
+from collections import OrderedDict
+
+import pytest
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api import parsers, renderers
+
+PAYLOAD = {
+    'results': [OrderedDict((
+        ('id', 1),
+        ('name', 'Произведение\u2028\u2029"в кавычках"'),
+        ('pub_date', datetime.datetime(
+            2023, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc
+        )),
+        ('local', datetime.datetime(2023, 5, 1, 12, 30)),
+        ('day', datetime.date(2023, 5, 1)),
+        ('time', datetime.time(12, 30)),
+        ('duration', datetime.timedelta(hours=1)),
+        ('price', decimal.Decimal('10.25')),
+        ('uuid', uuid.UUID(int=1)),
+        ('tags', ('a', 'b')),
+        ('scores', {1: 2}),
+        ('rating', None),
+        ('ratio', 0.1),
+        ('big', 2 ** 70),
+    ))],
+}
+
+
+class Test22JSONRenderer:
+
+    @pytest.mark.parametrize('media_type', (None, 'application/json; indent=4'))
+    def test_01_same_output_as_drf(self, media_type):
+        assert renderers.FastJSONRenderer().render(
+            PAYLOAD, media_type
+        ) == JSONRenderer().render(PAYLOAD, media_type), (
+            'Проверьте, что FastJSONRenderer выводит даты, Decimal и '
+            'остальные типы так же, как JSONRenderer.'
+        )
+
+    def test_02_uses_orjson(self, monkeypatch):
+        pytest.importorskip('orjson')
+        payload = {'results': [dict(PAYLOAD['results'][0], big=0)]}
+        expected = JSONRenderer().render(payload)
+
+        def stdlib_render(*args, **kwargs):
+            raise AssertionError('Использован стандартный json.')
+
+        monkeypatch.setattr(JSONRenderer, 'render', stdlib_render)
+        assert renderers.FastJSONRenderer().render(payload) == expected
+
+    def test_03_stdlib_fallback(self, monkeypatch):
+        monkeypatch.setattr(renderers, 'orjson', None)
+        monkeypatch.setattr(parsers, 'orjson', None)
+        assert renderers.FastJSONRenderer().render(
+            PAYLOAD
+        ) == JSONRenderer().render(PAYLOAD), (
+            'Проверьте, что без orjson рендерер использует стандартный json.'
+        )
+        assert parsers.FastJSONParser().parse(
+            io.BytesIO('{"name": "Имя"}'.encode())
+        ) == {'name': 'Имя'}
+
+    @pytest.mark.parametrize('body', (
+        '{"name": "Имя", "year": 2000, "genre": ["drama"]}',
+        '{"score": 1.5, "text": null}',
+    ))
+    def test_04_parser(self, body):
+        assert parsers.FastJSONParser().parse(
+            io.BytesIO(body.encode())
+        ) == JSONParser().parse(io.BytesIO(body.encode()))
+
+    @pytest.mark.parametrize('body', ('{"score": NaN}', '{"a": ', ''))
+    def test_05_parser_errors(self, body):
+        with pytest.raises(ParseError):
+            parsers.FastJSONParser().parse(io.BytesIO(body.encode()))
+        with pytest.raises(ParseError):
+            JSONParser().parse(io.BytesIO(body.encode()))
+
+    def test_06_cp1251_body(self):
+        assert parsers.FastJSONParser().parse(
+            io.BytesIO('{"name": "Имя"}'.encode('cp1251')),
+            parser_context={'encoding': 'cp1251'},
+        ) == {'name': 'Имя'}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_07_api_json_round_trip(self, admin_client):
+        response = admin_client.post(
+            '/api/v1/genres/', data='{"name": "Драма", "slug": "drama"}',
+            content_type='application/json',
+        )
+        assert response.status_code == 201, (
+            'Проверьте, что API принимает тело запроса в формате JSON.'
+        )
+        assert response.content == '{"name":"Драма","slug":"drama"}'.encode()
@@ -0,0 +1,111 @@
+import gzip
+import json
+
+import pytest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+
+from api import middleware
+from api.middleware import CompressionMiddleware
+from reviews.models import Title
+
+BODY = json.dumps([{'name': 'Произведение', 'year': 2000}] * 100).encode()
+
+
+def respond(response, accept_encoding='gzip, deflate'):
+    request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=accept_encoding)
+    return CompressionMiddleware(lambda request: response)(request)
+
+
+class Test23Compression:
+
+    def test_01_gzip(self):
+        response = respond(HttpResponse(BODY, 'application/json'))
+        assert response['Content-Encoding'] == 'gzip', (
+            'Проверьте, что ответы JSON сжимаются, если клиент принимает gzip.'
+        )
+        assert gzip.decompress(response.content) == BODY
+        assert response['Content-Length'] == str(len(response.content))
+        assert 'Accept-Encoding' in response['Vary']
+
+    @pytest.mark.parametrize('response, accept_encoding', (
+        (HttpResponse(b'{"a": 1}', 'application/json'), 'gzip'),
+        (HttpResponse(BODY, 'image/png'), 'gzip'),
+        (HttpResponse(BODY, 'text/html; charset=utf-8'), 'gzip'),
+        (HttpResponse(BODY, 'application/json'), 'identity'),
+        (HttpResponse(BODY, 'application/json'), 'gzip;q=0'),
+    ))
+    def test_02_not_compressed(self, response, accept_encoding):
+        assert not respond(response, accept_encoding).has_header(
+            'Content-Encoding'
+        ), (
+            'Проверьте, что не сжимаются короткие ответы, ответы с типом '
+            'не из списка (в том числе HTML) и ответы клиентам, не '
+            'принимающим gzip.'
+        )
+
+    def test_03_streaming(self):
+        chunks = [BODY[:1000], BODY[1000:]]
+        response = respond(StreamingHttpResponse(
+            iter(chunks), content_type='application/json'
+        ))
+        assert response['Content-Encoding'] == 'gzip'
+        parts = list(response.streaming_content)
+        assert len(parts) >= len(chunks), (
+            'Проверьте, что потоковый ответ сжимается по фрагментам.'
+        )
+        assert gzip.decompress(b''.join(parts)) == BODY
+
+    def test_04_weak_etag(self):
+        response = HttpResponse(BODY, 'application/json')
+        response['ETag'] = '"abc"'
+        assert respond(response)['ETag'] == 'W/"abc"'
+
+    def test_05_brotli(self, monkeypatch):
+        brotli = pytest.importorskip('brotli')
+        monkeypatch.setattr(middleware, 'brotli', brotli)
+        response = respond(
+            HttpResponse(BODY, 'application/json'), 'gzip, br'
+        )
+        assert response['Content-Encoding'] == 'br'
+        assert brotli.decompress(response.content) == BODY
+
+    def test_06_gzip_without_brotli(self, monkeypatch):
+        monkeypatch.setattr(middleware, 'brotli', None)
+        response = respond(HttpResponse(BODY, 'application/json'), 'br, gzip')
+        assert response['Content-Encoding'] == 'gzip', (
+            'Проверьте, что без пакета brotli используется gzip.'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_07_api_conditional_get(self, client):
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {idx}', year=2000) for idx in range(50)
+        )
+        response = client.get('/api/v1/titles/', HTTP_ACCEPT_ENCODING='gzip')
+        assert response['Content-Encoding'] == 'gzip'
+        assert json.loads(gzip.decompress(response.content))['count'] == 50
+        response = client.get(
+            '/api/v1/titles/', HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=response['ETag'],
+        )
+        assert response.status_code == 304, (
+            'Проверьте, что слабый ETag сжатого ответа подходит для '
+            'условного запроса.'
+        )
+
+    @pytest.mark.parametrize('accept_encoding, expected', (
+        ('gzip, br', 'br'),
+        ('gzip;q=1.0, br;q=0.5', 'gzip'),
+        ('br;q=0.2, *;q=0.8', 'gzip'),
+        ('*', 'br'),
+        ('br;q=0, gzip;q=0', None),
+        ('gzip;q=0.5, identity', None),
+        ('deflate', None),
+    ))
+    def test_08_quality_values(self, monkeypatch, accept_encoding,
+                               expected):
+        monkeypatch.setattr(middleware, 'brotli', object())
+        assert middleware.choose_encoding(accept_encoding) == expected, (
+            'Проверьте, что выбирается кодировка с наибольшим весом q.'
+        )
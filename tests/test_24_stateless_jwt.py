@@ -0,0 +1,135 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from reviews.models import Title
+from users import authentication
+from users.authentication import RoleAccessToken, states
+
+
+def make_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(user)}'
+    )
+    return client
+
+
+def user_queries(client, method, url, **kwargs):
+    reset_queries()
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(url, **kwargs)
+    return response, [
+        query['sql'] for query in context.captured_queries
+        if 'users_user' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24StatelessJWT:
+
+    def test_01_token_carries_role(self, client, admin):
+        response = client.post('/api/v1/auth/token/', data={
+            'username': admin.username,
+            'confirmation_code': default_token_generator.make_token(admin),
+        })
+        assert response.status_code == 200
+        api = APIClient()
+        api.credentials(HTTP_AUTHORIZATION=f'Bearer {response.json()["token"]}')
+        response, queries = user_queries(api, 'get', '/api/v1/genres/')
+        assert response.status_code == 200
+        assert len(queries) == 1 and 'tokens_valid_after' in queries[0], (
+            'Проверьте, что токен содержит роль пользователя и '
+            'аутентификация читает из таблицы пользователей только момент '
+            'последней смены прав.'
+        )
+        response, queries = user_queries(api, 'get', '/api/v1/genres/')
+        assert not queries, (
+            'Проверьте, что момент смены прав кэшируется в процессе.'
+        )
+        response = api.post(
+            '/api/v1/genres/', data={'name': 'Драма', 'slug': 'drama'}
+        )
+        assert response.status_code == 201
+
+    def test_02_review_author_without_user_query(self, user):
+        title = Title.objects.create(name='Чужой', year=1979)
+        client = make_client(user)
+        client.get('/api/v1/genres/')
+        response, queries = user_queries(
+            client, 'post', f'/api/v1/titles/{title.pk}/reviews/',
+            data={'text': 'Отзыв', 'score': 8},
+        )
+        assert response.status_code == 201
+        assert response.json()['author'] == user.username
+        assert not any(sql.lstrip().startswith('SELECT') for sql in queries)
+
+    def test_03_demoted_user_loses_access(self, admin, user_superuser_client):
+        client = make_client(admin)
+        assert client.get('/api/v1/users/').status_code == 200
+        response = user_superuser_client.patch(
+            f'/api/v1/users/{admin.username}/', data={'role': 'user'}
+        )
+        assert response.status_code == 200
+        assert client.get('/api/v1/users/').status_code == 403, (
+            'Проверьте, что после смены роли токен с прежней ролью в '
+            'claims больше не даёт прав администратора.'
+        )
+
+    def test_04_revocation_reaches_other_processes(self, admin, settings,
+                                                   monkeypatch):
+        clock = SimpleNamespace(monotonic=time.monotonic)
+        monkeypatch.setattr(authentication, 'time', clock)
+        client = make_client(admin)
+        assert client.get('/api/v1/users/').status_code == 200
+        # В другом процессе сигнал сохранения не сбрасывает состояние
+        # в памяти: оно устаревает только по истечении своего времени.
+        monkeypatch.setattr(states, 'discard', lambda user_id: None)
+        admin.role = 'user'
+        admin.save()
+        now = time.monotonic() + settings.AUTH_USER_CACHE_TIMEOUT + 1
+        clock.monotonic = lambda: now
+        assert client.get('/api/v1/users/').status_code == 403, (
+            'Проверьте, что смена роли доходит до других процессов через '
+            'БД после истечения кэша в памяти.'
+        )
+
+    def test_05_deleted_and_inactive_users(self, admin, user):
+        admin_client, user_client = make_client(admin), make_client(user)
+        user.is_active = False
+        user.save(update_fields=('is_active',))
+        assert user_client.get('/api/v1/users/me/').status_code == 401
+        admin.delete()
+        assert admin_client.get('/api/v1/users/').status_code == 401, (
+            'Проверьте, что токены удалённых и неактивных пользователей '
+            'отклоняются.'
+        )
+
+    def test_06_revocation_survives_cache_eviction(self, admin,
+                                                   user_superuser_client):
+        client = make_client(admin)
+        assert client.get('/api/v1/users/').status_code == 200
+        user_superuser_client.patch(
+            f'/api/v1/users/{admin.username}/', data={'role': 'user'}
+        )
+        cache.clear()
+        states.clear()
+        assert client.get('/api/v1/users/').status_code == 403, (
+            'Проверьте, что смена роли не забывается при вытеснении '
+            'записей из кэша.'
+        )
+
+    def test_07_profile_edit_keeps_claims(self, user):
+        client = make_client(user)
+        client.patch('/api/v1/users/me/', data={'bio': 'Новое описание'})
+        user.refresh_from_db()
+        assert user.tokens_valid_after is None, (
+            'Проверьте, что изменение полей, которых нет в токене, не '
+            'отменяет claims выданных токенов.'
+        )
@@ -0,0 +1,86 @@
+import pytest
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review, Title
+from users.authentication import states
+
+
+def create_reviews(django_user_model, title, authors):
+    django_user_model.objects.bulk_create(
+        django_user_model(
+            username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+        )
+        for idx in range(authors)
+    )
+    users = django_user_model.objects.filter(
+        username__startswith='author'
+    ).order_by('pk')
+    Review.objects.bulk_create(
+        Review(title=title, author=user, text='Отзыв', score=5)
+        for user in users
+    )
+    # bulk_create не отправляет сигналы, которые ведут рейтинг.
+    Title.objects.filter(pk=title.pk).rebuild_rating()
+    review = Review.objects.filter(title=title).first()
+    Comment.objects.bulk_create(
+        Comment(review=review, author=user, text='Комментарий')
+        for user in users
+    )
+    return review
+
+
+def get_queries(client, url):
+    states.clear()
+    reset_queries()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response, [query['sql'] for query in context.captured_queries]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25AuthorLoading:
+
+    @pytest.mark.parametrize('rows', (True, False))
+    @pytest.mark.parametrize('suffix', (
+        'reviews/', 'reviews/?cursor=', 'reviews/{review_id}/comments/',
+    ))
+    def test_01_constant_queries(self, client, settings, django_user_model,
+                                 rows, suffix):
+        settings.API_ROW_SERIALIZATION = rows
+        counts = []
+        for authors in (3, 40):
+            title = Title.objects.create(name=f'Книга {authors}', year=2000)
+            review = create_reviews(django_user_model, title, authors)
+            url = f'/api/v1/titles/{title.pk}/' + suffix.format(
+                review_id=review.pk
+            )
+            response, queries = get_queries(client, url)
+            assert len({
+                item['author'] for item in response.json()['results']
+            }) == authors
+            counts.append(len(queries))
+            django_user_model.objects.filter(
+                username__startswith='author'
+            ).delete()
+        assert counts[0] == counts[1], (
+            'Проверьте, что число SQL-запросов к списку отзывов и '
+            'комментариев не зависит от числа разных авторов на странице: '
+            f'{counts[0]} для 3 авторов и {counts[1]} для 40.'
+        )
+
+    @pytest.mark.parametrize('rows', (True, False))
+    def test_02_only_username_column(self, client, settings,
+                                     django_user_model, rows):
+        settings.API_ROW_SERIALIZATION = rows
+        title = Title.objects.create(name='Книга', year=2000)
+        create_reviews(django_user_model, title, 3)
+        _, queries = get_queries(client, f'/api/v1/titles/{title.pk}/reviews/')
+        sql = '\n'.join(queries)
+        assert '"users_user"."username"' in sql
+        for column in ('password', 'email', 'bio'):
+            assert f'"users_user"."{column}"' not in sql, (
+                'Проверьте, что для авторов отзывов загружается только '
+                'столбец username.'
+            )
@@ -0,0 +1,81 @@
+import pytest
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+
+from api.serializers import TitleWriteSerializer
+from reviews.models import Category, Genre
+
+
+class PerSlugSerializer(serializers.Serializer):
+    """Прежнее поле жанров: запрос на каждый слаг."""
+
+    genre = serializers.SlugRelatedField(
+        queryset=Genre.objects.all(), slug_field='slug', many=True
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26TitleSlugResolution:
+
+    @pytest.fixture
+    def genres(self):
+        Category.objects.create(name='Фильм', slug='films')
+        return [
+            Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+            for idx in range(8)
+        ]
+
+    def test_01_single_query(self, genres):
+        slugs = [genre.slug for genre in reversed(genres)] + ['genre-0']
+        reset_queries()
+        with CaptureQueriesContext(connection) as context:
+            serializer = TitleWriteSerializer(data={
+                'name': 'Произведение', 'year': 2000,
+                'category': 'films', 'genre': slugs,
+            })
+            assert serializer.is_valid(), serializer.errors
+        genre_queries = [
+            query for query in context.captured_queries
+            if 'FROM "reviews_genre"' in query['sql']
+        ]
+        assert len(genre_queries) == 1, (
+            'Проверьте, что слаги жанров переводятся в объекты одним '
+            'запросом.'
+        )
+        assert [
+            genre.slug for genre in serializer.validated_data['genre']
+        ] == slugs, 'Проверьте, что порядок жанров сохраняется.'
+
+    @pytest.mark.parametrize('value', (
+        ['genre-1', 'unknown', 'missing'],
+        'genre-1',
+        [{'slug': 'genre-1'}],
+        [7, 'genre-2'],
+    ))
+    def test_02_same_errors(self, genres, value):
+        serializer = TitleWriteSerializer(data={
+            'name': 'Произведение', 'year': 2000,
+            'category': 'films', 'genre': value,
+        })
+        expected = PerSlugSerializer(data={'genre': value})
+        assert not expected.is_valid()
+        assert not serializer.is_valid()
+        assert serializer.errors['genre'] == expected.errors['genre'], (
+            'Проверьте, что ошибки для неизвестных слагов жанров не '
+            'изменились.'
+        )
+
+    def test_03_create_and_update(self, admin_client, genres):
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Произведение', 'year': 2000, 'category': 'films',
+            'genre': ['genre-3', 'genre-1'],
+        })
+        assert response.status_code == 201, response.json()
+        assert sorted(response.json()['genre']) == ['genre-1', 'genre-3']
+        response = admin_client.patch(
+            f'/api/v1/titles/{response.json()["id"]}/',
+            data={'genre': ['genre-5']}, format='json',
+        )
+        assert response.status_code == 200
+        assert response.json()['genre'] == ['genre-5']
@@ -0,0 +1,223 @@
+import pytest
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, GenreTitle, Title
+
+URL = '/api/v1/titles/bulk/'
+
+
+def title_data(number, category='films', genre=('drama', 'comedy')):
+    return {
+        'name': f'Произведение {number}', 'year': 2000,
+        'category': category, 'genre': list(genre),
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27TitleBulkCreate:
+
+    @pytest.fixture(autouse=True)
+    def slugs(self):
+        Category.objects.create(name='Фильм', slug='films')
+        Category.objects.create(name='Книга', slug='books')
+        Genre.objects.create(name='Драма', slug='drama')
+        Genre.objects.create(name='Комедия', slug='comedy')
+
+    def count_queries(self, client, data):
+        reset_queries()
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(URL, data=data, format='json')
+        assert response.status_code == 201, response.json()
+        return len(context.captured_queries) - len(data), response
+
+    def test_01_create(self, admin_client):
+        data = [
+            title_data(1),
+            title_data(2, 'books', ('comedy', 'comedy')),
+        ]
+        response = admin_client.post(URL, data=data, format='json')
+        assert response.status_code == 201, (
+            'Проверьте, что POST-запрос администратора к `/api/v1/titles/'
+            'bulk/` создаёт произведения и возвращает статус 201.'
+        )
+        body = response.json()
+        assert [title['name'] for title in body] == [
+            'Произведение 1', 'Произведение 2'
+        ], 'Проверьте, что произведения возвращаются в порядке запроса.'
+        assert body[1]['category'] == {'name': 'Книга', 'slug': 'books'}
+        assert sorted(genre['slug'] for genre in body[0]['genre']) == [
+            'comedy', 'drama'
+        ]
+        assert body[0]['rating'] is None
+        assert Title.objects.count() == 2
+        assert GenreTitle.objects.filter(title_id=body[1]['id']).count() == 1
+
+    def test_02_constant_queries(self, admin_client):
+        # Первый запрос загружает claims пользователя из БД.
+        self.count_queries(admin_client, [title_data(0)])
+        small, _ = self.count_queries(
+            admin_client, [title_data(idx) for idx in range(2)]
+        )
+        large, _ = self.count_queries(
+            admin_client, [title_data(idx) for idx in range(20)]
+        )
+        assert small == large, (
+            'Проверьте, что слаги и связи с жанрами загружаются и создаются '
+            'числом запросов, не зависящим от числа произведений.'
+        )
+
+    def test_03_errors_per_item(self, admin_client):
+        data = [
+            title_data(1),
+            title_data(2, 'unknown'),
+            title_data(3, genre=('drama', 'missing')),
+        ]
+        response = admin_client.post(URL, data=data, format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert len(errors) == 3 and errors[0] == {}, (
+            'Проверьте, что ошибки возвращаются списком по элементам.'
+        )
+        assert set(errors[1]) == {'category'}
+        assert set(errors[2]) == {'genre'}
+        assert not Title.objects.exists(), (
+            'Проверьте, что при ошибке в одном элементе не создаётся ни '
+            'одно произведение.'
+        )
+
+    @pytest.mark.parametrize('data', ({'name': 'Произведение'}, 'text'))
+    def test_04_not_a_list(self, admin_client, data):
+        response = admin_client.post(URL, data=data, format='json')
+        assert response.status_code == 400
+        assert 'non_field_errors' in response.json()
+
+    def test_05_max_items(self, admin_client, settings):
+        settings.API_BULK_MAX_ITEMS = 2
+        response = admin_client.post(
+            URL, data=[title_data(idx) for idx in range(3)], format='json'
+        )
+        assert response.status_code == 400
+        assert 'non_field_errors' in response.json()
+        assert not Title.objects.exists()
+
+    def test_06_permissions(self, client, user_client, moderator_client):
+        data = [title_data(1)]
+        assert client.post(
+            URL, data=data, content_type='application/json'
+        ).status_code == 401
+        for other in (user_client, moderator_client):
+            assert other.post(URL, data=data, format='json').status_code == (
+                403
+            ), 'Проверьте, что создавать произведения может только админ.'
+        assert not Title.objects.exists()
+
+    def test_07_invalidates_list(self, admin_client, client):
+        assert client.get('/api/v1/titles/').json()['count'] == 0
+        admin_client.post(URL, data=[title_data(1)], format='json')
+        assert client.get('/api/v1/titles/').json()['count'] == 1, (
+            'Проверьте, что создание списка сбрасывает кэш произведений.'
+        )
+
+    def create_titles(self, admin_client, count):
+        response = admin_client.post(
+            URL, data=[title_data(idx) for idx in range(count)], format='json'
+        )
+        assert response.status_code == 201, response.json()
+        return [title['id'] for title in response.json()]
+
+    def test_08_update(self, admin_client):
+        first, second = self.create_titles(admin_client, 2)
+        response = admin_client.patch(URL, data=[
+            {'id': second, 'genre': ['comedy', 'comedy'], 'year': 1990},
+            {'id': first, 'name': 'Новое название', 'category': 'books'},
+        ], format='json')
+        assert response.status_code == 200, (
+            'Проверьте, что PATCH-запрос администратора к `/api/v1/titles/'
+            'bulk/` изменяет произведения и возвращает статус 200.'
+        )
+        body = response.json()
+        assert [title['id'] for title in body] == [second, first], (
+            'Проверьте, что произведения возвращаются в порядке запроса.'
+        )
+        assert body[0]['year'] == 1990
+        assert [genre['slug'] for genre in body[0]['genre']] == ['comedy'], (
+            'Проверьте, что поле `genre` заменяет жанры произведения.'
+        )
+        assert body[0]['name'] == 'Произведение 1'
+        assert body[1]['name'] == 'Новое название'
+        assert body[1]['category'] == {'name': 'Книга', 'slug': 'books'}
+        assert len(body[1]['genre']) == 2, (
+            'Проверьте, что жанры не меняются, если `genre` не передано.'
+        )
+        assert GenreTitle.objects.filter(title_id=second).count() == 1
+
+    def test_09_update_constant_queries(self, admin_client):
+        ids = self.create_titles(admin_client, 20)
+        counts = []
+        for size in (2, 20):
+            reset_queries()
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.patch(URL, data=[
+                    {'id': pk, 'year': 1999, 'genre': ['drama']}
+                    for pk in ids[:size]
+                ], format='json')
+            assert response.status_code == 200, response.json()
+            counts.append(len(context.captured_queries))
+        assert counts[0] == counts[1], (
+            'Проверьте, что произведения и их жанры изменяются числом '
+            'запросов, не зависящим от числа произведений.'
+        )
+
+    def test_10_update_errors(self, admin_client):
+        first, second = self.create_titles(admin_client, 2)
+        response = admin_client.patch(URL, data=[
+            {'id': first, 'year': 1990},
+            {'id': 10 ** 6, 'year': 1990},
+            {'year': 1990},
+            {'id': first, 'year': 1990},
+        ], format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert errors[0] == {} and all(
+            set(error) == {'id'} for error in errors[1:]
+        ), 'Проверьте, что ошибки в `id` возвращаются по элементам.'
+        response = admin_client.patch(URL, data=[
+            {'id': first, 'year': 1990},
+            {'id': second, 'category': 'unknown'},
+        ], format='json')
+        assert response.status_code == 400
+        assert set(response.json()[1]) == {'category'}
+        assert not Title.objects.filter(year=1990).exists(), (
+            'Проверьте, что при ошибке не изменяется ни одно произведение.'
+        )
+
+    def test_11_update_permissions(self, admin_client, user_client,
+                                   moderator_client):
+        pk, = self.create_titles(admin_client, 1)
+        data = [{'id': pk, 'year': 1990}]
+        for other in (user_client, moderator_client):
+            assert other.patch(URL, data=data, format='json').status_code == (
+                403
+            ), 'Проверьте, что изменять произведения может только админ.'
+        assert not Title.objects.filter(year=1990).exists()
+
+    def test_12_update_invalidates(self, admin_client, client):
+        pk, = self.create_titles(admin_client, 1)
+        assert client.get('/api/v1/titles/').json()['results'][0]['year'] == (
+            2000
+        )
+        assert client.get(f'/api/v1/titles/{pk}/').json()['year'] == 2000
+        admin_client.patch(URL, data=[
+            {'id': pk, 'year': 1990, 'name': 'Новое название'}
+        ], format='json')
+        assert client.get('/api/v1/titles/').json()['results'][0]['year'] == (
+            1990
+        ), 'Проверьте, что изменение списка сбрасывает кэш произведений.'
+        assert client.get(f'/api/v1/titles/{pk}/').json()['year'] == 1990, (
+            'Проверьте, что изменение списка сбрасывает кэш произведения.'
+        )
+        response = client.get('/api/v1/autocomplete/', {'q': 'Новое'})
+        assert [item['name'] for item in response.json()] == [
+            'Новое название'
+        ], 'Проверьте, что переименование обновляет подсказки.'
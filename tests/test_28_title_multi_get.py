@@ -0,0 +1,100 @@
+import pytest
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+from rest_framework.settings import api_settings
+
+from reviews.models import Category, Genre, Title
+
+URL = '/api/v1/titles/'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28TitleMultiGet:
+
+    @pytest.fixture
+    def titles(self):
+        category = Category.objects.create(name='Фильм', slug='films')
+        genres = [
+            Genre.objects.create(name='Драма', slug='drama'),
+            Genre.objects.create(name='Комедия', slug='comedy'),
+        ]
+        titles = []
+        for idx in range(12):
+            title = Title.objects.create(
+                name=f'Произведение {idx}', year=2000, category=category
+            )
+            title.genre.set(genres)
+            titles.append(title)
+        return titles
+
+    def get_ids(self, client, ids):
+        response = client.get(URL, {'ids': ','.join(map(str, ids))})
+        assert response.status_code == 200, response.json()
+        return [title['id'] for title in response.json()['results']]
+
+    def test_01_requested_order(self, client, titles):
+        ids = [titles[5].pk, titles[0].pk, titles[9].pk, titles[5].pk]
+        assert self.get_ids(client, ids) == ids[:3], (
+            'Проверьте, что фильтр `ids` возвращает произведения в порядке '
+            'запроса без повторов.'
+        )
+
+    def test_02_unknown_ids(self, client, titles):
+        assert self.get_ids(client, [10 ** 6, titles[1].pk]) == [
+            titles[1].pk
+        ], 'Проверьте, что несуществующие id пропускаются.'
+
+    @pytest.mark.parametrize('value', ('abc', '1,x'))
+    def test_03_invalid(self, client, value):
+        response = client.get(URL, {'ids': value})
+        assert response.status_code == 400
+        assert 'ids' in response.json()
+
+    def test_04_max_ids(self, client, settings):
+        settings.API_MAX_IDS = 2
+        assert client.get(URL, {'ids': '1,2,3'}).status_code == 400
+
+    def test_05_constant_queries(self, client, titles):
+        counts = []
+        for size in (2, 12):
+            reset_queries()
+            with CaptureQueriesContext(connection) as context:
+                self.get_ids(client, [title.pk for title in titles[:size]])
+            counts.append(len(context.captured_queries))
+        assert counts[0] == counts[1], (
+            'Проверьте, что число запросов к БД не зависит от числа id.'
+        )
+
+    def test_06_same_as_detail(self, client, titles):
+        response = client.get(URL, {'ids': f'{titles[3].pk}'})
+        detail = client.get(f'{URL}{titles[3].pk}/').json()
+        result = response.json()['results'][0]
+        detail['genre'].sort(key=lambda genre: genre['slug'])
+        result['genre'].sort(key=lambda genre: genre['slug'])
+        assert result == detail
+
+    def test_07_combines_with_filters(self, client, titles):
+        Title.objects.filter(pk=titles[2].pk).update(year=1990)
+        response = client.get(URL, {
+            'ids': f'{titles[2].pk},{titles[1].pk}', 'year': 2000,
+        })
+        assert [
+            title['id'] for title in response.json()['results']
+        ] == [titles[1].pk]
+
+    def test_08_more_than_page_size(self, client):
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {idx}', year=2000)
+            for idx in range(api_settings.PAGE_SIZE + 5)
+        )
+        ids = list(Title.objects.order_by('-pk').values_list('pk', flat=True))
+        response = client.get(URL, {'ids': ','.join(map(str, ids))})
+        data = response.json()
+        assert [title['id'] for title in data['results']] == ids, (
+            'Проверьте, что фильтр `ids` возвращает все найденные '
+            'произведения одной страницей.'
+        )
+        assert data['next'] is None
+        assert len(client.get(URL).json()['results']) == (
+            api_settings.PAGE_SIZE
+        )
@@ -0,0 +1,112 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Title
+from tests.utils import create_single_review
+
+
+def histogram(**counts):
+    return {str(score): counts.get(f's{score}', 0) for score in range(1, 11)}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29TitleScoreHistogram:
+
+    @pytest.fixture
+    def title(self):
+        return Title.objects.create(
+            name='Произведение', year=2000,
+            category=Category.objects.create(name='Фильм', slug='films'),
+        )
+
+    def get_title(self, client, title):
+        response = client.get(f'/api/v1/titles/{title.pk}/')
+        assert response.status_code == HTTPStatus.OK
+        return response.json()
+
+    def test_01_follows_review_changes(self, title, admin_client,
+                                       user_client, moderator_client):
+        assert self.get_title(admin_client, title)['scores'] == histogram()
+        review = create_single_review(admin_client, title.pk, 'text', 7).json()
+        create_single_review(user_client, title.pk, 'text', 7)
+        create_single_review(moderator_client, title.pk, 'text', 2)
+        data = self.get_title(admin_client, title)
+        assert data['scores'] == histogram(s2=1, s7=2), (
+            'Проверьте, что после создания отзыва гистограмма оценок '
+            'произведения обновляется.'
+        )
+        assert data['reviews_count'] == 3
+
+        review_url = f'/api/v1/titles/{title.pk}/reviews/{review["id"]}/'
+        response = admin_client.patch(review_url, data={'score': 10})
+        assert response.status_code == HTTPStatus.OK
+        data = self.get_title(admin_client, title)
+        assert data['scores'] == histogram(s2=1, s7=1, s10=1), (
+            'Проверьте, что изменение оценки переносит отзыв в другой '
+            'столбец гистограммы.'
+        )
+        assert data['reviews_count'] == 3
+
+        response = admin_client.patch(review_url, data={'text': 'new'})
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_title(admin_client, title)['scores'] == histogram(
+            s2=1, s7=1, s10=1
+        )
+
+        response = admin_client.delete(review_url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        data = self.get_title(admin_client, title)
+        assert data['scores'] == histogram(s2=1, s7=1), (
+            'Проверьте, что после удаления отзыва гистограмма оценок '
+            'произведения обновляется.'
+        )
+        assert data['reviews_count'] == 2
+        assert data['rating'] == 4
+
+    def test_02_list_matches_detail(self, title, admin_client, settings):
+        create_single_review(admin_client, title.pk, 'text', 4)
+        detail = self.get_title(admin_client, title)
+        for rows in (True, False):
+            settings.API_ROW_SERIALIZATION = rows
+            result = admin_client.get('/api/v1/titles/').json()['results'][0]
+            assert result['scores'] == detail['scores'] == histogram(s4=1)
+            assert result['reviews_count'] == detail['reviews_count'] == 1
+
+    def test_03_served_without_reviews(self, title, admin_client, client):
+        create_single_review(admin_client, title.pk, 'text', 4)
+        reset_queries()
+        with CaptureQueriesContext(connection) as context:
+            self.get_title(client, title)
+        assert not any(
+            'reviews_review' in query['sql']
+            for query in context.captured_queries
+        ), 'Проверьте, что гистограмма не считается по таблице отзывов.'
+
+    def test_04_omit_defers_columns(self, title, client):
+        reset_queries()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(
+                f'/api/v1/titles/{title.pk}/', {'omit': 'scores'}
+            )
+        assert 'scores' not in response.json()
+        assert not any(
+            'score_1' in query['sql'] for query in context.captured_queries
+        ), 'Проверьте, что невыбранная гистограмма не загружается из БД.'
+
+    def test_05_rebuild_ratings_command(self, title, admin_client):
+        create_single_review(admin_client, title.pk, 'text', 3)
+        Title.objects.update(score_3=0, score_5=1)
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', '--check')
+        call_command('rebuild_ratings')
+        call_command('rebuild_ratings', '--check')
+        title.refresh_from_db()
+        assert (title.score_3, title.score_5) == (1, 0), (
+            'Проверьте, что команда `rebuild_ratings` пересчитывает '
+            'гистограмму оценок.'
+        )